@@ -1,15 +1,37 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file
+from flask.json.provider import DefaultJSONProvider
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
+# flask-sock is optional; without it the WebSocket upload route is not registered
+try:
+    from flask_sock import Sock
+except ImportError:
+    Sock = None
 import os
-import json
+import logging
 import uuid
+import random
 from datetime import datetime, timedelta
-import base64
+# Prefer pybase64's SIMD decoder; the stdlib module has the same API
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+# orjson is optional; without it Flask's stdlib JSON provider is used
+try:
+    import orjson
+except ImportError:
+    orjson = None
 import wave
 import threading
 import time
 import subprocess
+import shutil
+import queue
 import tempfile
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
 
 # Import configuration handler
 from config import config
@@ -17,27 +39,310 @@ from config import config
 # Import OpenAI service
 from openai_service import openai_service
 
+# Import recording metadata store
+from recording_store import recording_store
+
+# Import per-chunk audio features
+from scripts.audio_processor import chunk_rms
+
+class ORJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider that parses and serializes with orjson"""
+    
+    def dumps(self, obj, **kwargs):
+        option = orjson.OPT_INDENT_2 if 'indent' in kwargs else 0
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=self.default, option=option).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+if orjson is not None:
+    app.json = ORJSONProvider(app)
+sock = Sock(app) if Sock is not None else None
 # Allow configured origins for CORS
-CORS(app, origins=config.get_cors_origins())
+CORS(app, origins=config.cors_origins)
+# Reject oversized request bodies before they are read
+app.config['MAX_CONTENT_LENGTH'] = config.get_max_chunk_size()
+# Apply the same cap to each WebSocket message
+app.config['SOCK_SERVER_OPTIONS'] = {'max_message_size': config.get_max_chunk_size()}
 
 # Create recordings directory
-RECORDINGS_DIR = config.get_recordings_dir()
+RECORDINGS_DIR = config.recordings_dir
 if not os.path.exists(RECORDINGS_DIR):
     os.makedirs(RECORDINGS_DIR)
 
-# Store active recordings and transcription sessions
+# fdatasync skips flushing file metadata; not every platform provides it
+_fdatasync = getattr(os, 'fdatasync', os.fsync)
+
+# Block size used when streaming raw chunk uploads to disk; large enough
+# that a typical chunk is read in a handful of recv calls
+STREAM_BLOCK_SIZE = 256 * 1024
+
+# Debug logs estimate a chunk's energy from at most this many leading bytes,
+# so the estimate stays cheap on large chunks without NumPy
+ENERGY_SAMPLE_BYTES = 64 * 1024
+
+# Idle SSE streams send a comment this often so proxies keep them open
+SSE_KEEPALIVE_SECONDS = 15
+
+# Per-chunk messages go through this logger and are skipped unless
+# ENABLE_AUDIO_DEBUG is set, so the hot path does no formatting or I/O
+log = logging.getLogger('audio')
+log.setLevel(logging.DEBUG if config.audio_debug else logging.WARNING)
+if not log.handlers:
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter('%(message)s'))
+    log.addHandler(_log_handler)
+    log.propagate = False
+
+# Resolve ffmpeg once; without it recordings are kept as WebM
+FFMPEG_BIN = shutil.which('ffmpeg')
+if FFMPEG_BIN is None:
+    print("⚠️ ffmpeg not found on PATH; recordings will be saved as WebM")
+
+# Store in-progress recordings (open files, counters) and transcription
+# sessions in memory; recording metadata is persisted in recording_store.
+# active_recordings is keyed by the 16-byte UUID (see recording_key)
 active_recordings = {}
 active_transcriptions = {}  # New: track real-time transcription sessions
+# Stopped recordings still being converted/summarized, keyed like
+# active_recordings
+finalizing_recordings = {}
+# Final stop results of recently finished recordings, handed out once by
+# /recording/status; bounded so results nobody polls for do not pile up
+finalized_results = OrderedDict()
+finalized_results_lock = threading.Lock()
+MAX_FINALIZED_RESULTS = 256
+
+# Runs ffmpeg conversion and the post-call OpenAI requests off the request thread
+finalize_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='finalize')
+# Independent post-call OpenAI requests run side by side here; kept apart from
+# finalize_executor so a finalize job never waits on its own pool
+openai_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='openai')
+
+def recording_key(recording_id):
+    """Convert a public recording id into the 16-byte key used in memory
+    
+    Raises ValueError for anything that is not a valid UUID, so malformed
+    ids are rejected before they reach any lookup.
+    """
+    try:
+        return uuid.UUID(recording_id).bytes
+    except (TypeError, AttributeError, ValueError):
+        raise ValueError(f"Invalid recording id: {recording_id!r}")
+
+def parse_recording_id(recording_id):
+    """Get the canonical string id and the in-memory key for a public id
+    
+    Upper-case, hyphen-less and braced UUIDs all map to the lower-case
+    hyphenated form that active_transcriptions and recording_store use.
+    Raises ValueError like recording_key.
+    """
+    key = recording_key(recording_id)
+    return str(uuid.UUID(bytes=key)), key
+
+def is_recording_active(recording_id):
+    """Check whether a recording id refers to an in-progress recording"""
+    try:
+        return recording_key(recording_id) in active_recordings
+    except ValueError:
+        return False
+
+def get_recording(recording_id):
+    """Look up a recording whether it is in progress, processing or completed"""
+    recording_id, key = parse_recording_id(recording_id)
+    recording_info = active_recordings.get(key) or finalizing_recordings.get(key)
+    if recording_info is None:
+        recording_info = recording_store.get(recording_id)
+    return recording_info
+
+def get_file_size(filepath):
+    """Get a file's size with a single stat call, or None if it does not exist"""
+    try:
+        return os.stat(filepath).st_size
+    except FileNotFoundError:
+        return None
+
+def finish_recording(key):
+    """Move a recording from the active set to the finalizing set"""
+    recording_info = active_recordings.pop(key)
+    recording_info["status"] = "processing"
+    finalizing_recordings[key] = recording_info
+    return recording_info
+
+class ChunkWriter:
+    """Appends recording chunks to disk on a background thread.
+    
+    Pending writes are drained in batches and coalesced per file into a
+    single writev(2) call, so a burst of chunks costs one syscall per file.
+    Files must be opened unbuffered since writes bypass Python's buffers.
+    Only recording files go through here; live encoders are fed by their
+    own EncoderFeeder so a stalled pipe cannot hold up disk writes.
+    """
+    
+    def __init__(self, max_batch=32):
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='chunk-writer', daemon=True)
+        self._thread.start()
+    
+    def submit(self, f, data):
+        """Queue bytes to be appended to an open file; returns immediately"""
+        self._queue.put((f, data))
+    
+    def flush(self):
+        """Block until every write submitted so far has reached its file"""
+        done = threading.Event()
+        self._queue.put((None, done))
+        done.wait()
+    
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            
+            pending = {}
+            for f, data in batch:
+                if f is None:
+                    # Flush marker: everything queued before it must be written first
+                    self._write_pending(pending)
+                    pending = {}
+                    data.set()
+                else:
+                    pending.setdefault(f, []).append(data)
+            self._write_pending(pending)
+    
+    def _write_pending(self, pending):
+        for f, buffers in pending.items():
+            try:
+                fd = f.fileno()
+                total = sum(len(b) for b in buffers)
+                written = os.writev(fd, buffers)
+                if written < total:
+                    # Short write: finish the remainder the slow way
+                    remainder = memoryview(b''.join(buffers))[written:]
+                    while remainder:
+                        remainder = remainder[os.write(fd, remainder):]
+            except Exception as e:
+                log.error("❌ Error writing chunk to %s: %s", getattr(f, 'name', f), e)
+
+chunk_writer = ChunkWriter()
+
+# Bytes a live MP3 encoder may fall behind before it is dropped (about
+# 20 minutes of 48 kbps Opus), so a stalled ffmpeg cannot grow memory unbounded
+ENCODER_MAX_BACKLOG = 8 * 1024 * 1024
+
+class EncoderFeeder:
+    """Feeds one live MP3 encoder's stdin on its own thread.
+    
+    Pipe writes block while ffmpeg is busy, so each encoder gets a thread of
+    its own and a slow one only delays itself. An encoder that stops reading
+    (broken pipe) or falls more than max_backlog bytes behind is dropped and
+    killed; the recording's WebM file is converted instead.
+    """
+    
+    def __init__(self, process, max_backlog=ENCODER_MAX_BACKLOG):
+        self.process = process
+        self.max_backlog = max_backlog
+        self.failed = False
+        self._backlog = 0
+        self._backlog_lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='mp3-feeder', daemon=True)
+        self._thread.start()
+    
+    def submit(self, data):
+        """Queue bytes for the encoder; returns immediately"""
+        if self.failed:
+            return
+        with self._backlog_lock:
+            self._backlog += len(data)
+            overflow = self._backlog > self.max_backlog
+        if overflow:
+            self._fail(f"fell more than {self.max_backlog} bytes behind")
+            return
+        self._queue.put(data)
+    
+    def close(self):
+        """Close the encoder's stdin once queued bytes are written, ending the MP3"""
+        self._queue.put(None)
+    
+    def _fail(self, reason):
+        self.failed = True
+        log.error("❌ Dropping live MP3 encoder: %s", reason)
+        # Killing it also unblocks a write stuck on the full pipe
+        self.process.kill()
+    
+    def _run(self):
+        stdin = self.process.stdin
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            if not self.failed:
+                try:
+                    remainder = memoryview(data)
+                    while remainder:
+                        remainder = remainder[os.write(stdin.fileno(), remainder):]
+                except OSError as e:
+                    if not self.failed:
+                        self._fail(e)
+            with self._backlog_lock:
+                self._backlog -= len(data)
+        try:
+            stdin.close()
+        except OSError:
+            pass
+
+# Simulated transcription responses
+SAMPLE_PHRASES = (
+    "Hello, how are you doing today?",
+    "This is a test of the transcription system.",
+    "The weather is really nice outside.",
+    "I'm testing the real-time speech recognition.",
+    "This system is working quite well.",
+    "Yes, I can hear you clearly.",
+    "The audio quality sounds good.",
+    "Let me process that for you."
+)
+
+# Labels the frontend sends instead of recognized text
+PLACEHOLDER_SPEECH_LABELS = ("Speech detected", "Final chunk")
+
+def needs_model_transcription(detected_speech):
+    """Check whether a chunk has to go through the transcription API"""
+    return not detected_speech or detected_speech in PLACEHOLDER_SPEECH_LABELS
+
+def transcribe_batch(audio_chunks):
+    """Transcribe several raw audio chunks in one call
+    
+    This is where a real ASR backend runs the whole batch at once; the
+    placeholder simulates each chunk.
+    """
+    return [SimpleTranscriber._simulate_transcription_api(chunk) for chunk in audio_chunks]
 
 class SimpleTranscriber:
     """Simple transcription service that processes audio chunks"""
     
     def __init__(self, recording_id):
         self.recording_id = recording_id
-        self.transcription = ['']
+        # Finished phrases are only ever appended, so a prefix length is a
+        # stable snapshot; the phrase still being revised lives in current
+        self.finalized = []
+        self.current = ''
         self.is_running = False
-        self.last_update = datetime.now()
+        # Monotonic clock for phrase timing; wall clock only for reporting
+        self.last_update_mono = time.monotonic()
+        self.last_update = time.time()
+        # Chunks of one recording can arrive on several request threads;
+        # callers hold this while processing and reading the transcription
+        self.lock = threading.Lock()
         
     def start_transcription(self):
         """Start transcription session"""  
@@ -45,103 +350,87 @@ class SimpleTranscriber:
         print(f"📝 Started transcription for recording {self.recording_id}")
         return True
     
-    def process_audio_chunk(self, audio_data_b64):
-        """Process an audio chunk for transcription"""
+    def process_audio_chunk(self, audio_bytes, simulated_text):
+        """Apply the transcription of a raw audio chunk (see transcribe_batch)"""
         try:
-            current_time = datetime.now()  
-            
-            # Always try to process the chunk (remove size restriction for debugging)
-            simulated_text = self._simulate_transcription_api(audio_data_b64)
+            current_time = time.monotonic()
             
             if simulated_text:
                 # Update current phrase or add new one based on timing
-                time_since_last = (current_time - self.last_update).total_seconds()
+                time_since_last = current_time - self.last_update_mono
                 
                 if time_since_last > 2:  # Reduced to 2 seconds for more responsive updates
-                    self.transcription.append(simulated_text)
-                    print(f"📝 NEW PHRASE: {simulated_text}")
+                    self._start_phrase(simulated_text)
+                    log.debug("📝 NEW PHRASE: %s", simulated_text)
                 else:
                     # Update current phrase
-                    self.transcription[-1] = simulated_text
-                    print(f"📝 UPDATED PHRASE: {simulated_text}")
+                    self.current = simulated_text
+                    log.debug("📝 UPDATED PHRASE: %s", simulated_text)
                 
-                self.last_update = current_time
+                self.last_update_mono = current_time
+                self.last_update = time.time()
                 return simulated_text
             else:
                 # Even if no transcription, log that we received the chunk
-                try:
-                    chunk_size = len(base64.b64decode(audio_data_b64))
-                    print(f"📦 Processed chunk: {chunk_size} bytes (no transcription generated)")
-                except:
-                    print(f"📦 Processed chunk: invalid base64")
+                log.debug("📦 Processed chunk: %d bytes (no transcription generated)", len(audio_bytes))
             
         except Exception as e:
-            print(f"❌ Error processing chunk for transcription: {e}")
+            log.error("❌ Error processing chunk for transcription: %s", e)
         
         return None
     
-    def process_speech_detected_chunk(self, audio_data_b64, detected_speech):
-        """Process an audio chunk that was detected to contain speech"""
+    def process_speech_detected_chunk(self, audio_bytes, detected_speech, simulated_text):
+        """Process a raw audio chunk that was detected to contain speech"""
         try:
-            current_time = datetime.now()
+            current_time = time.monotonic()
             
             # For speech-detected chunks, we can use the detected speech directly
             # or still process through the transcription API for verification
-            print(f"🗣️ Processing speech-detected chunk: '{detected_speech}'")
+            log.debug("🗣️ Processing speech-detected chunk: '%s'", detected_speech)
             
             # Option 1: Use the detected speech directly (faster)
-            if detected_speech and detected_speech not in ["Speech detected", "Final chunk"]:
+            if not needs_model_transcription(detected_speech):
                 transcribed_text = detected_speech.strip()
             else:
-                # Option 2: Still process through API for better accuracy
-                transcribed_text = self._simulate_transcription_api(audio_data_b64)
+                # Option 2: Use the transcription API's result for better accuracy
+                transcribed_text = simulated_text
             
             if transcribed_text:
                 # Always add as new phrase for speech-detected chunks
                 # since they represent complete speech segments
-                self.transcription.append(transcribed_text)
-                self.last_update = current_time
-                print(f"📝 NEW SPEECH PHRASE: {transcribed_text}")
+                self._start_phrase(transcribed_text)
+                self.last_update_mono = current_time
+                self.last_update = time.time()
+                log.debug("📝 NEW SPEECH PHRASE: %s", transcribed_text)
                 return transcribed_text
             else:
-                print(f"⚪ No transcription from speech-detected chunk")
+                log.debug("⚪ No transcription from speech-detected chunk")
                 
         except Exception as e:
-            print(f"❌ Error processing speech-detected chunk: {e}")
+            log.error("❌ Error processing speech-detected chunk: %s", e)
         
         return None
     
-    def _simulate_transcription_api(self, audio_data_b64):
+    @staticmethod
+    def _simulate_transcription_api(audio_bytes):
         """Simulate transcription API call"""
         # This is a placeholder - replace with actual API call
         # Example: OpenAI Whisper API, Google Speech-to-Text, etc.
         
-        try:
-            # Decode the audio data (just to check if it's valid)
-            audio_bytes = base64.b64decode(audio_data_b64)
-            
-            # Simulate API response based on audio data size
-            if len(audio_bytes) > 100:  # Lowered threshold - process smaller chunks too
-                # Simulate different responses
-                sample_phrases = [
-                    "Hello, how are you doing today?",
-                    "This is a test of the transcription system.",
-                    "The weather is really nice outside.",
-                    "I'm testing the real-time speech recognition.",
-                    "This system is working quite well.",
-                    "Yes, I can hear you clearly.",
-                    "The audio quality sounds good.",
-                    "Let me process that for you."
-                ]
-                
-                # Return a random phrase (in real implementation, this would be actual transcription)
-                import random
-                return sample_phrases[random.randint(0, len(sample_phrases) - 1)]
-            
-        except Exception as e:
-            print(f"❌ Simulation error: {e}")
-            
-        return None
+        # Simulate API response based on audio data size; the threshold is
+        # low so smaller chunks are processed too. In a real implementation
+        # this would be actual transcription
+        return random.choice(SAMPLE_PHRASES) if len(audio_bytes) > 100 else None
+    
+    def _start_phrase(self, text):
+        """Finalize the current phrase and start a new one"""
+        self.finalized.append(self.current)
+        self.current = text
+    
+    @property
+    def transcription(self):
+        """Full transcription: finalized phrases followed by the current one"""
+        return [*self.finalized, self.current]
     
     def stop_transcription(self):
         """Stop transcription and return final result"""
@@ -152,12 +441,211 @@ class SimpleTranscriber:
     def get_current_transcription(self):
         """Get current transcription state"""
         return {
-            'current_text': self.transcription[-1] if self.transcription else '',
-            'full_transcription': self.transcription.copy(),
-            'last_update': self.last_update.isoformat(),
+            'current_text': self.current,
+            # Shared, not copied: readers slice it to finalized_count
+            'finalized': self.finalized,
+            'finalized_count': len(self.finalized),
+            'last_update': datetime.fromtimestamp(self.last_update).isoformat(),
             'is_active': self.is_running
         }
 
+def publish_transcription(session, **fields):
+    """Update a transcription session and wake any SSE subscribers"""
+    with session['updated']:
+        session.update(fields)
+        session['version'] += 1
+        session['updated'].notify_all()
+
+def full_transcription(session):
+    """Build a session's phrase list; only done when a client asks for it
+    
+    Live views carry at most the last MAX_TRANSCRIPT_PHRASES finalized phrases;
+    the transcript saved on stop always has all of them.
+    """
+    count = session.get('finalized_count', 0)
+    start = max(0, count - config.max_transcript_phrases)
+    return [*session.get('finalized', ())[start:count], session.get('current_text', '')]
+
+def transcription_payload(session):
+    """Public view of a transcription session"""
+    return {
+        'current_text': session.get('current_text', ''),
+        'full_transcription': full_transcription(session),
+        'last_update': session.get('last_update', ''),
+        'is_active': session.get('is_active', True)
+    }
+
+def process_chunk_transcription(recording_id, audio_bytes, detected_speech, chunk_count, simulated_text):
+    """Apply a transcribed chunk to the recording's transcriber, if one is running"""
+    transcription_result = None
+    # A single get: the session may be removed by stop_recording at any time
+    session = active_transcriptions.get(recording_id)
+    if session is not None:
+        try:
+            transcriber = session.get('transcriber')
+            if transcriber:
+                with transcriber.lock:
+                    if not transcriber.is_running:
+                        return None
+                    if detected_speech:
+                        log.debug("🎤 Processing SPEECH-DETECTED chunk %d for transcription (%d bytes)", chunk_count, len(audio_bytes))
+                        # Priority processing for speech-detected chunks
+                        transcribed_text = transcriber.process_speech_detected_chunk(audio_bytes, detected_speech, simulated_text)
+                    else:
+                        log.debug("🎤 Processing regular chunk %d for transcription (%d bytes)", chunk_count, len(audio_bytes))
+                        transcribed_text = transcriber.process_audio_chunk(audio_bytes, simulated_text)
+                    
+                    if transcribed_text:
+                        # Update the active transcription data; publishing under
+                        # the lock keeps snapshots in order
+                        transcription_data = transcriber.get_current_transcription()
+                        publish_transcription(session, **transcription_data)
+                
+                if transcribed_text:
+                    transcription_result = transcribed_text
+                    log.debug("✅ Transcription result: %s", transcribed_text)
+                else:
+                    log.debug("⚪ No transcription generated for chunk %d", chunk_count)
+        except Exception as e:
+            log.error("❌ Error processing transcription for chunk: %s", e)
+    
+    return transcription_result
+
+# Chunk sizes (bytes) separating the short / medium / long batching buckets.
+# MediaRecorder's Opus runs around 48 kbps, so roughly 0.5 s and 1.5 s of audio
+BUCKET_LIMITS = (3_000, 9_000)
+
+def length_bucket(size):
+    """Get the index of the length bucket for a chunk of this many bytes"""
+    for index, limit in enumerate(BUCKET_LIMITS):
+        if size < limit:
+            return index
+    return len(BUCKET_LIMITS)
+
+class TranscriptionBatcher:
+    """Transcribes queued chunks from all recordings on a background thread.
+    
+    Chunks that need the model are grouped into buckets of similar length
+    (see BUCKET_LIMITS) so a real batched model pads little. Each bucket is
+    sent to transcribe_batch on its own once it holds max_batch chunks or its
+    oldest chunk has waited max_wait. Results are applied to the transcribers
+    in arrival order.
+    """
+    
+    def __init__(self, max_wait=0.05, max_batch=16):
+        self.max_wait = max_wait
+        self.max_batch = max_batch
+        self._queue = queue.Queue()
+        # Only touched by the batcher thread
+        self._buckets = [[] for _ in range(len(BUCKET_LIMITS) + 1)]
+        self._deadlines = [None] * len(self._buckets)
+        self._arrivals = deque()  # [recording_id, audio, speech, chunk_count, text, ready]
+        self._thread = threading.Thread(target=self._run, name='transcription-batcher', daemon=True)
+        self._thread.start()
+    
+    def submit(self, recording_id, audio_bytes, detected_speech, chunk_count):
+        """Queue a raw chunk for transcription; returns immediately"""
+        self._queue.put((recording_id, audio_bytes, detected_speech, chunk_count))
+    
+    def flush(self):
+        """Block until every chunk submitted so far has been transcribed"""
+        done = threading.Event()
+        self._queue.put((None, done, None, None))
+        done.wait()
+    
+    def _run(self):
+        while True:
+            try:
+                recording_id, audio_bytes, detected_speech, chunk_count = self._queue.get(timeout=self._next_timeout())
+            except queue.Empty:
+                recording_id = audio_bytes = None
+            
+            if recording_id is None and audio_bytes is not None:
+                # Flush marker: everything queued before it must be done first
+                self._flush_buckets(force=True)
+                self._apply_ready()
+                audio_bytes.set()
+                continue
+            
+            if recording_id is not None:
+                self._add(recording_id, audio_bytes, detected_speech, chunk_count)
+            self._flush_buckets()
+            self._apply_ready()
+    
+    def _next_timeout(self):
+        deadlines = [d for d in self._deadlines if d is not None]
+        if not deadlines:
+            return None
+        return max(0, min(deadlines) - time.monotonic())
+    
+    def _add(self, recording_id, audio_bytes, detected_speech, chunk_count):
+        item = [recording_id, audio_bytes, detected_speech, chunk_count, None, False]
+        self._arrivals.append(item)
+        if not needs_model_transcription(detected_speech):
+            item[5] = True
+            return
+        
+        index = length_bucket(len(audio_bytes))
+        if not self._buckets[index]:
+            self._deadlines[index] = time.monotonic() + self.max_wait
+        self._buckets[index].append(item)
+    
+    def _flush_buckets(self, force=False):
+        now = time.monotonic()
+        for index, bucket in enumerate(self._buckets):
+            if bucket and (force or len(bucket) >= self.max_batch or now >= self._deadlines[index]):
+                self._buckets[index] = []
+                self._deadlines[index] = None
+                self._transcribe(bucket)
+    
+    def _transcribe(self, bucket):
+        try:
+            texts = transcribe_batch([item[1] for item in bucket])
+        except Exception as e:
+            log.error("❌ Error transcribing batch of %d chunks: %s", len(bucket), e)
+            texts = [None] * len(bucket)
+        for item, text in zip(bucket, texts):
+            item[4] = text
+            item[5] = True
+    
+    def _apply_ready(self):
+        while self._arrivals and self._arrivals[0][5]:
+            recording_id, audio_bytes, detected_speech, chunk_count, text, _ = self._arrivals.popleft()
+            process_chunk_transcription(recording_id, audio_bytes, detected_speech, chunk_count, text)
+
+transcription_batcher = TranscriptionBatcher()
+
+def queue_chunk_transcription(recording_id, audio_bytes, detected_speech, chunk_count):
+    """Queue a chunk for transcription if the recording has a transcriber"""
+    if recording_id not in active_transcriptions:
+        return False
+    transcription_batcher.submit(recording_id, audio_bytes, detected_speech, chunk_count)
+    return True
+
+def submit_chunk(recording_info, audio_bytes):
+    """Queue bytes for the recording's WebM file and its live MP3 encoder"""
+    chunk_writer.submit(recording_info["file"], audio_bytes)
+    encoder = recording_info.get("encoder")
+    if encoder is not None:
+        encoder.submit(audio_bytes)
+
+def ingest_chunk(recording_info, audio_bytes):
+    """Queue a raw chunk for writing and count it
+    
+    Returns the chunk's number, or None if the recording has already stopped.
+    """
+    with recording_info["lock"]:
+        if recording_info["status"] != "recording":
+            return None
+        submit_chunk(recording_info, audio_bytes)
+        recording_info["data_size"] += len(audio_bytes)
+        recording_info["chunks_count"] += 1
+        return recording_info["chunks_count"]
+
+@app.errorhandler(RequestEntityTooLarge)
+def request_too_large(e):
+    return jsonify({"success": False, "error": f"Request body exceeds {app.config['MAX_CONTENT_LENGTH']} bytes"}), 413
+
 @app.route('/')
 def home():
     return {"message": "Audio Recording Backend", "status": "running"}
@@ -174,20 +662,32 @@ def start_recording():
         enable_transcription = data.get('enable_transcription', True)  # New option
         
         # Generate unique recording ID
-        recording_id = str(uuid.uuid4())
+        recording_uuid = uuid.uuid4()
+        recording_id = str(recording_uuid)
         
         # Create recording metadata
         recording_info = {
             "id": recording_id,
             "model": model,
-            "start_time": datetime.now().isoformat(),
+            "start_time": datetime.now().isoformat(timespec='seconds'),
+            "start_monotonic": time.monotonic(),
             "status": "recording",
-            "chunks": [],
+            "chunks_count": 0,
+            "data_size": 0,
             "filename": f"recording_{recording_id}.mp3",
-            "transcription_enabled": enable_transcription
+            "webm_filename": f"recording_{recording_id}.webm",
+            "transcription_enabled": enable_transcription,
+            "lock": threading.Lock()
         }
         
-        active_recordings[recording_id] = recording_info
+        # Open the WebM file up front so chunks are streamed straight to disk,
+        # and start ffmpeg so the MP3 is encoded while the call goes on
+        webm_filepath = os.path.join(RECORDINGS_DIR, recording_info["webm_filename"])
+        recording_info["file"] = open(webm_filepath, 'wb', buffering=0)
+        recording_info["encoder"] = start_mp3_encoder(os.path.join(RECORDINGS_DIR, recording_info["filename"]))
+        
+        active_recordings[recording_uuid.bytes] = recording_info
+        recording_store.create(recording_id, model, recording_info["start_time"], recording_info["filename"])
         
         # Start real-time transcription if enabled
         transcription_started = False
@@ -198,8 +698,13 @@ def start_recording():
                     active_transcriptions[recording_id] = {
                         'transcriber': transcriber,
                         'current_text': '',
-                        'full_transcription': [''],
-                        'last_update': datetime.now().isoformat()
+                        'finalized': (),
+                        'finalized_count': 0,
+                        'last_update': datetime.now().isoformat(),
+                        'is_active': True,
+                        # Bumped and notified on every update (see publish_transcription)
+                        'version': 0,
+                        'updated': threading.Condition()
                     }
                     transcription_started = True
             except Exception as e:
@@ -218,96 +723,271 @@ def start_recording():
 @app.route('/recording/chunk', methods=['POST'])
 def upload_chunk():
     try:
-        data = request.get_json()
+        # Parse the raw body directly; chunk bodies are large and only read once
+        data = app.json.loads(request.get_data(cache=False))
         recording_id = data.get('recording_id')
         audio_data = data.get('audio_data')  # Base64 encoded audio
         detected_speech = data.get('detected_speech')  # Optional: detected speech text
         
-        if recording_id not in active_recordings:
+        try:
+            recording_id, key = parse_recording_id(recording_id)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid recording id"}), 400
+        
+        recording_info = active_recordings.get(key)
+        if recording_info is None:
             return jsonify({"success": False, "error": "Recording not found"}), 404
         
         if not audio_data:
             return jsonify({"success": False, "error": "No audio data provided"}), 400
         
-        # Store the audio chunk
-        active_recordings[recording_id]["chunks"].append(audio_data)
-        chunk_count = len(active_recordings[recording_id]["chunks"])
+        # Decode once and append the raw bytes to the open recording file;
+        # strict decoding so stray characters are an error, not dropped
+        try:
+            decoded_chunk = base64.b64decode(audio_data, validate=True)
+        except (ValueError, TypeError) as decode_error:
+            log.warning("❌ Error decoding chunk: %s", decode_error)
+            return jsonify({"success": False, "error": "Invalid audio data"}), 400
+        
+        chunk_size = len(decoded_chunk)
+        chunk_count = ingest_chunk(recording_info, decoded_chunk)
+        if chunk_count is None:
+            # The recording was stopped since it was looked up
+            return jsonify({"success": False, "error": "Recording not found"}), 404
+        
+        # Log with speech detection info if available
+        if detected_speech:
+            log.debug("🗣️ SPEECH-DETECTED chunk %d for recording %s: %d bytes - '%s'", chunk_count, recording_id, chunk_size, detected_speech)
+        else:
+            log.debug("📦 Received chunk %d for recording %s: %d bytes", chunk_count, recording_id, chunk_size)
+        
+        # Also log first few bytes to see if it's valid audio data
+        if chunk_size > 10 and log.isEnabledFor(logging.DEBUG):
+            energy = chunk_rms(memoryview(decoded_chunk)[:ENERGY_SAMPLE_BYTES])
+            log.debug("🔍 Chunk header: %s, energy: %.1f", decoded_chunk[:10].hex(), energy)
+        
+        # Queue chunk for transcription if enabled
+        transcription_queued = queue_chunk_transcription(recording_id, decoded_chunk, detected_speech, chunk_count)
+        
+        return jsonify({
+            "success": True,
+            "message": "Chunk uploaded",
+            "chunks_count": chunk_count,
+            "chunk_size": chunk_size,
+            "transcription_queued": transcription_queued,
+            "speech_detected": bool(detected_speech)
+        })
+        
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        log.error("❌ Error uploading chunk: %s", e)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/recording/chunk/batch', methods=['POST'])
+def upload_chunk_batch():
+    """Upload several base64 chunks in one request
+    
+    Body: {"recording_id": ..., "chunks": [...]} where each chunk is a base64
+    string or {"audio_data": ..., "detected_speech": ...}. Chunks are appended
+    in order; the whole body is still limited to MAX_CHUNK_SIZE.
+    """
+    try:
+        data = app.json.loads(request.get_data(cache=False))
+        recording_id = data.get('recording_id')
+        chunks = data.get('chunks')
+        
+        try:
+            recording_id, key = parse_recording_id(recording_id)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid recording id"}), 400
+        
+        recording_info = active_recordings.get(key)
+        if recording_info is None:
+            return jsonify({"success": False, "error": "Recording not found"}), 404
+        
+        if not chunks or not isinstance(chunks, list):
+            return jsonify({"success": False, "error": "No audio data provided"}), 400
+        
+        # Decode everything first so a bad chunk rejects the whole batch
+        decoded_chunks = []
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, dict):
+                    audio_data, detected_speech = chunk.get('audio_data'), chunk.get('detected_speech')
+                else:
+                    audio_data, detected_speech = chunk, None
+                if not audio_data:
+                    return jsonify({"success": False, "error": "No audio data provided"}), 400
+                decoded_chunks.append((base64.b64decode(audio_data, validate=True), detected_speech))
+        except (ValueError, TypeError) as decode_error:
+            log.warning("❌ Error decoding chunk batch: %s", decode_error)
+            return jsonify({"success": False, "error": "Invalid audio data"}), 400
+        
+        total_size = 0
+        transcription_queued = False
+        for decoded_chunk, detected_speech in decoded_chunks:
+            chunk_count = ingest_chunk(recording_info, decoded_chunk)
+            if chunk_count is None:
+                # The recording was stopped part way through the batch
+                return jsonify({"success": False, "error": "Recording not found"}), 404
+            total_size += len(decoded_chunk)
+            # True if any chunk of the batch was queued
+            transcription_queued |= queue_chunk_transcription(recording_id, decoded_chunk, detected_speech, chunk_count)
+        
+        log.debug("📦 Received %d batched chunks for recording %s: %d bytes", len(decoded_chunks), recording_id, total_size)
+        
+        return jsonify({
+            "success": True,
+            "message": "Chunks uploaded",
+            "chunks_count": chunk_count,
+            "chunks_received": len(decoded_chunks),
+            "chunk_size": total_size,
+            "transcription_queued": transcription_queued
+        })
+        
+    except RequestEntityTooLarge:
+        raise
+    except Exception as e:
+        log.error("❌ Error uploading chunk batch: %s", e)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+@app.route('/recording/chunk_bin', methods=['POST'])
+@app.route('/recording/chunk/<recording_id>', methods=['POST'])
+def upload_chunk_binary(recording_id=None):
+    """Upload a raw audio chunk sent as the request body (no base64/JSON)
+    
+    The recording id comes from the URL or the X-Recording-Id header.
+    """
+    try:
+        if recording_id is None:
+            recording_id = request.headers.get('X-Recording-Id')
+        detected_speech = unquote(request.headers.get('X-Detected-Speech', ''))
         
-        # Decode and check the chunk size for debugging FIRST
-        chunk_size = 0
         try:
-            decoded_chunk = base64.b64decode(audio_data)
-            chunk_size = len(decoded_chunk)
+            recording_id, key = parse_recording_id(recording_id)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid recording id"}), 400
+        
+        recording_info = active_recordings.get(key)
+        if recording_info is None:
+            return jsonify({"success": False, "error": "Recording not found"}), 404
+        
+        # Read the whole body (capped by MAX_CONTENT_LENGTH) before taking the
+        # lock, so a slow client never holds it and a body cut off part way
+        # writes nothing
+        blocks = list(iter(lambda: request.stream.read(STREAM_BLOCK_SIZE), b''))
+        chunk_size = sum(map(len, blocks))
+        if chunk_size == 0:
+            return jsonify({"success": False, "error": "No audio data provided"}), 400
+        
+        with recording_info["lock"]:
+            # The recording may have been stopped since it was looked up
+            if recording_info["status"] != "recording":
+                return jsonify({"success": False, "error": "Recording not found"}), 404
             
-            # Log with speech detection info if available
-            if detected_speech:
-                print(f"�️ SPEECH-DETECTED chunk {chunk_count} for recording {recording_id}: {chunk_size} bytes - '{detected_speech}'")
-            else:
-                print(f"�📦 Received chunk {chunk_count} for recording {recording_id}: {chunk_size} bytes")
+            for block in blocks:
+                submit_chunk(recording_info, block)
             
-            # Also log first few bytes to see if it's valid audio data
-            if chunk_size > 10:
-                header_bytes = decoded_chunk[:10].hex()
-                print(f"🔍 Chunk header: {header_bytes}")
-                
-        except Exception as decode_error:
-            print(f"❌ Error decoding chunk: {decode_error}")
+            recording_info["data_size"] += chunk_size
+            recording_info["chunks_count"] += 1
+            chunk_count = recording_info["chunks_count"]
         
-        # Process chunk for transcription if enabled
-        transcription_result = None
-        if recording_id in active_transcriptions:
-            try:
-                transcriber = active_transcriptions[recording_id].get('transcriber')
-                if transcriber and transcriber.is_running:
-                    if detected_speech:
-                        print(f"🎤 Processing SPEECH-DETECTED chunk {chunk_count} for transcription ({chunk_size} bytes)")
-                        # Priority processing for speech-detected chunks
-                        transcribed_text = transcriber.process_speech_detected_chunk(audio_data, detected_speech)
-                    else:
-                        print(f"🎤 Processing regular chunk {chunk_count} for transcription ({chunk_size} bytes)")
-                        transcribed_text = transcriber.process_audio_chunk(audio_data)
-                    
-                    if transcribed_text:
-                        # Update the active transcription data
-                        transcription_data = transcriber.get_current_transcription()
-                        active_transcriptions[recording_id].update(transcription_data)
-                        transcription_result = transcribed_text
-                        print(f"✅ Transcription result: {transcribed_text}")
-                    else:
-                        print(f"⚪ No transcription generated for chunk {chunk_count}")
-            except Exception as e:
-                print(f"❌ Error processing transcription for chunk: {e}")
+        if detected_speech:
+            log.debug("🗣️ SPEECH-DETECTED raw chunk %d for recording %s: %d bytes - '%s'", chunk_count, recording_id, chunk_size, detected_speech)
+        else:
+            log.debug("📦 Received raw chunk %d for recording %s: %d bytes", chunk_count, recording_id, chunk_size)
+        
+        # Queue chunk for transcription if enabled
+        transcription_queued = queue_chunk_transcription(recording_id, b''.join(blocks), detected_speech, chunk_count)
         
         return jsonify({
             "success": True,
             "message": "Chunk uploaded",
             "chunks_count": chunk_count,
             "chunk_size": chunk_size,
-            "transcription_result": transcription_result,
+            "transcription_queued": transcription_queued,
             "speech_detected": bool(detected_speech)
         })
         
+    except RequestEntityTooLarge:
+        raise
     except Exception as e:
-        print(f"❌ Error uploading chunk: {e}")
+        log.error("❌ Error uploading raw chunk: %s", e)
         return jsonify({"success": False, "error": str(e)}), 500
 
+if sock is not None:
+    @sock.route('/recording/ws/<recording_id>')
+    def recording_socket(ws, recording_id):
+        """Receive a recording's audio as raw WebSocket frames
+        
+        Binary messages are audio chunks. Text messages are JSON controls:
+        {"detected_speech": ...} applies to the next chunk, and
+        {"action": "stop"} is acknowledged with {"action": "stopped"} before
+        the socket closes; the client then finalizes via /recording/stop.
+        A text message that is not a JSON object gets an error message and
+        closes the socket.
+        """
+        try:
+            recording_id, key = parse_recording_id(recording_id)
+        except ValueError:
+            ws.close(message="Invalid recording id")
+            return
+        
+        recording_info = active_recordings.get(key)
+        if recording_info is None:
+            ws.close(message="Recording not found")
+            return
+        
+        detected_speech = None
+        while True:
+            data = ws.receive()
+            
+            if isinstance(data, str):
+                try:
+                    message = app.json.loads(data)
+                except ValueError:
+                    message = None
+                if not isinstance(message, dict):
+                    ws.send(app.json.dumps({"success": False, "error": "Invalid control message"}))
+                    ws.close(reason=1007, message="Invalid control message")
+                    return
+                
+                if message.get('action') == 'stop':
+                    ws.send(app.json.dumps({"action": "stopped", "chunks_count": recording_info["chunks_count"]}))
+                    return
+                detected_speech = message.get('detected_speech')
+                continue
+            
+            chunk_count = ingest_chunk(recording_info, data)
+            if chunk_count is None:
+                ws.close(message="Recording is not active")
+                return
+            
+            log.debug("📡 Received socket chunk %d for recording %s: %d bytes", chunk_count, recording_id, len(data))
+            queue_chunk_transcription(recording_id, data, detected_speech, chunk_count)
+            detected_speech = None
+
 @app.route('/transcription/<recording_id>', methods=['GET'])
 def get_transcription(recording_id):
     """Get current transcription for a recording"""
     try:
-        if recording_id not in active_transcriptions:
-            return jsonify({"success": False, "error": "Transcription not found"}), 404
+        try:
+            recording_id, _ = parse_recording_id(recording_id)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid recording id"}), 400
         
-        transcription_data = active_transcriptions[recording_id]
+        transcription_data = active_transcriptions.get(recording_id)
+        if transcription_data is None:
+            return jsonify({"success": False, "error": "Transcription not found"}), 404
         
         return jsonify({
             "success": True,
             "recording_id": recording_id,
             "current_text": transcription_data.get('current_text', ''),
-            "full_transcription": transcription_data.get('full_transcription', ['']),
+            "full_transcription": full_transcription(transcription_data),
             "last_update": transcription_data.get('last_update', ''),
-            "is_active": recording_id in active_recordings and 
-                        active_recordings[recording_id]['status'] == 'recording'
+            "is_active": is_recording_active(recording_id)
         })
         
     except Exception as e:
@@ -316,16 +996,39 @@ def get_transcription(recording_id):
 @app.route('/transcription/stream/<recording_id>', methods=['GET'])
 def stream_transcription(recording_id):
     """Stream transcription updates (Server-Sent Events)"""
+    try:
+        recording_id, _ = parse_recording_id(recording_id)
+    except ValueError:
+        return jsonify({"success": False, "error": "Invalid recording id"}), 400
+    
+    session = active_transcriptions.get(recording_id)
+    if session is None:
+        return jsonify({"success": False, "error": "Transcription not found"}), 404
+    
     def generate_transcription_stream():
-        while (recording_id in active_transcriptions and 
-               recording_id in active_recordings and 
-               active_recordings[recording_id]['status'] == 'recording'):
+        updated = session['updated']
+        seen = -1
+        while True:
+            # Sleep until the transcriber publishes something new
+            with updated:
+                updated.wait_for(lambda: session['version'] != seen, timeout=SSE_KEEPALIVE_SECONDS)
+                version = session['version']
+                payload = transcription_payload(session)
+            
+            if version == seen:
+                yield ": keep-alive\n\n"
+                continue
             
-            transcription_data = active_transcriptions.get(recording_id, {})
-            yield f"data: {json.dumps(transcription_data)}\n\n"
-            time.sleep(0.5)  # Update every 500ms
+            seen = version
+            yield f"data: {app.json.dumps(payload)}\n\n"
+            if not payload['is_active']:
+                break
     
-    return jsonify({"message": "Use GET with Accept: text/event-stream header for streaming"})
+    return Response(
+        generate_transcription_stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/recording/stop', methods=['POST'])
 def stop_recording():
@@ -333,167 +1036,271 @@ def stop_recording():
         data = request.get_json()
         recording_id = data.get('recording_id')
         
-        if recording_id not in active_recordings:
+        try:
+            recording_id, key = parse_recording_id(recording_id)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid recording id"}), 400
+        
+        recording_info = active_recordings.get(key)
+        if recording_info is None:
             return jsonify({"success": False, "error": "Recording not found"}), 404
         
-        recording_info = active_recordings[recording_id]
-        recording_info["end_time"] = datetime.now().isoformat()
-        recording_info["status"] = "completed"
+        # Under the lock no chunk upload can be mid-write; once completed,
+        # later uploads see the status change and are rejected
+        with recording_info["lock"]:
+            if recording_info["status"] != "recording":
+                return jsonify({"success": False, "error": "Recording not found"}), 404
+            finish_recording(key)
+        recording_info["end_time"] = datetime.now().isoformat(timespec='seconds')
+        duration = time.monotonic() - recording_info["start_monotonic"]
+        recording_info["duration"] = duration
         
-        # Stop transcription if it was running
+        # Stop transcription if it was running, once its queued chunks are in
         final_transcription = []
-        if recording_id in active_transcriptions:
+        transcription_batcher.flush()
+        session = active_transcriptions.pop(recording_id, None)
+        if session is not None:
             try:
-                transcriber = active_transcriptions[recording_id].get('transcriber')
+                transcriber = session.get('transcriber')
                 if transcriber:
-                    final_transcription = transcriber.stop_transcription()
+                    with transcriber.lock:
+                        final_transcription = transcriber.stop_transcription()
                     print(f"📝 Final transcription: {final_transcription}")
                 
                 # Store final transcription in recording info
                 recording_info["transcription"] = final_transcription
                 
-                # Clean up transcription session
-                del active_transcriptions[recording_id]
+                # Let SSE subscribers send the final state
+                publish_transcription(session, is_active=False)
             except Exception as e:
                 print(f"❌ Error stopping transcription: {e}")
         
-        # Combine all chunks and save audio file
-        filename = recording_info["filename"]
-        filepath = os.path.join(RECORDINGS_DIR, filename)
+        # Wait for queued chunks to land, make them durable once (never per
+        # chunk), then close the file so it can be converted
+        chunk_writer.flush()
+        recording_file = recording_info.pop("file")
+        _fdatasync(recording_file.fileno())
+        webm_size = os.fstat(recording_file.fileno()).st_size
+        recording_file.close()
         
-        # Process the actual audio chunks
-        total_chunks = len(recording_info["chunks"])
-        print(f"🎵 Processing {total_chunks} audio chunks for recording {recording_id}")
+        # End of input lets the live encoder finish the MP3
+        encoder = recording_info.get("encoder")
+        if encoder is not None:
+            encoder.close()
         
-        if recording_info["chunks"]:
-            try:
-                # Combine all base64 audio chunks
-                all_audio_data = b''
-                valid_chunks = 0
-                
-                for i, chunk_b64 in enumerate(recording_info["chunks"]):
-                    try:
-                        chunk_data = base64.b64decode(chunk_b64)
-                        all_audio_data += chunk_data
-                        valid_chunks += 1
-                        print(f"✅ Processed chunk {i+1}: {len(chunk_data)} bytes")
-                    except Exception as chunk_error:
-                        print(f"❌ Failed to process chunk {i+1}: {chunk_error}")
-                
-                print(f"📊 Successfully processed {valid_chunks}/{total_chunks} chunks, total size: {len(all_audio_data)} bytes")
-                
-                if len(all_audio_data) > 0:
-                    # Save the combined audio data as temporary WebM file
-                    temp_webm_path = filepath  # Keep original WebM temporarily
-                    with open(temp_webm_path, 'wb') as f:
-                        f.write(all_audio_data)
-                    
-                    print(f"✅ Saved temporary WebM file: {temp_webm_path} ({len(all_audio_data)} bytes)")
-                    
-                    # Convert to MP3
-                    mp3_filename = filename.replace('.webm', '.mp3')
-                    mp3_filepath = os.path.join(RECORDINGS_DIR, mp3_filename)
-                    
-                    if convert_webm_to_mp3(temp_webm_path, mp3_filepath):
-                        # Update recording info to point to MP3 file
-                        recording_info["filename"] = mp3_filename
-                        filepath = mp3_filepath
-                        
-                        # Verify MP3 file was created
-                        if os.path.exists(mp3_filepath):
-                            mp3_size = os.path.getsize(mp3_filepath)
-                            print(f"🎵 MP3 file created successfully: {mp3_filepath} ({mp3_size} bytes)")
-                            
-                            # Clean up temporary WebM file
-                            try:
-                                os.remove(temp_webm_path)
-                                print(f"🗑️ Cleaned up temporary WebM file")
-                            except Exception as cleanup_error:
-                                print(f"⚠️ Could not clean up temporary file: {cleanup_error}")
-                        else:
-                            print(f"❌ MP3 file creation failed, keeping WebM")
-                    else:
-                        print(f"❌ MP3 conversion failed, keeping WebM file")
-                    
-                    # Verify the final file exists
-                    if os.path.exists(filepath):
-                        actual_size = os.path.getsize(filepath)
-                        print(f"📁 Final file verification: {filepath} exists, size: {actual_size} bytes")
-                    else:
-                        print(f"❌ Final file verification failed: {filepath} does not exist")
-                else:
-                    print(f"⚠️ No valid audio data to save")
-                    # Create error file
-                    with open(filepath, 'w') as f:
-                        f.write("No valid audio data processed")
-                
-                # Also save transcription as text file
-                if final_transcription:
-                    transcript_filename = f"transcript_{recording_id}.txt"
-                    transcript_filepath = os.path.join(RECORDINGS_DIR, transcript_filename)
-                    with open(transcript_filepath, 'w', encoding='utf-8') as f:
-                        f.write('\n'.join(final_transcription))
-                    print(f"✅ Saved transcript: {transcript_filepath}")
-                    recording_info["transcript_filename"] = transcript_filename
-                
-            except Exception as audio_error:
-                print(f"❌ Error processing audio chunks: {audio_error}")
-                # Fallback: create a minimal file indicating an error
-                with open(filepath, 'w') as f:
-                    f.write("Error processing audio chunks")
-        else:
-            # No chunks received, create empty file
-            print("⚠️ No audio chunks received")
-            with open(filepath, 'w') as f:
-                f.write("No audio data received")
+        recording_store.update(
+            recording_id,
+            status="processing",
+            end_time=recording_info["end_time"],
+            duration=duration
+        )
         
-        # Calculate duration
-        start_time = datetime.fromisoformat(recording_info["start_time"])
-        end_time = datetime.fromisoformat(recording_info["end_time"])
-        duration = (end_time - start_time).total_seconds()
+        # Convert and summarize in the background so the request returns now;
+        # clients poll /recording/status/<id> for the final result
+        finalize_executor.submit(finalize_recording, key, recording_info, webm_size, final_transcription)
         
-        recording_info["duration"] = duration
-        recording_info["file_size"] = os.path.getsize(filepath)
+        return jsonify({
+            "success": True,
+            "recording_id": recording_id,
+            "status": "processing",
+            "filename": recording_info["filename"],
+            "duration": duration,
+            "download_url": f"/download/{recording_id}",
+            "status_url": f"/recording/status/{recording_id}",
+            "transcription": final_transcription,
+            "transcript_available": bool(final_transcription)
+        }), 202
         
-        # Generate OpenAI response after call ends
-        openai_response = None
+    except Exception as e:
+        return jsonify({"success": False, "error": str(e)}), 500
+
+def finalize_recording(key, recording_info, webm_size, final_transcription):
+    """Convert a stopped recording, persist its metadata and generate the
+    post-call OpenAI response. Runs on finalize_executor; the result is
+    served by /recording/status/<id>.
+    
+    Afterwards the recording leaves memory except for its result; the
+    metadata store answers every other lookup.
+    """
+    recording_id = recording_info["id"]
+    duration = recording_info["duration"]
+    try:
+        result = _finalize_recording(recording_info, recording_id, duration, webm_size, final_transcription)
+    except Exception as e:
+        print(f"❌ Error finalizing recording {recording_id}: {e}")
+        recording_info["status"] = "failed"
+        recording_store.update(recording_id, status="failed")
+        result = {"success": False, "recording_id": recording_id, "status": "failed", "error": str(e)}
+    
+    # Publish the result before leaving the finalizing set, so a status
+    # check never sees neither
+    with finalized_results_lock:
+        finalized_results[key] = result
+        while len(finalized_results) > MAX_FINALIZED_RESULTS:
+            finalized_results.popitem(last=False)
+    finalizing_recordings.pop(key, None)
+    return result
+
+def _finalize_recording(recording_info, recording_id, duration, webm_size, final_transcription):
+    """Do the work of finalize_recording; errors propagate to the caller"""
+    filename = recording_info["filename"]
+    filepath = os.path.join(RECORDINGS_DIR, filename)
+    webm_filepath = os.path.join(RECORDINGS_DIR, recording_info["webm_filename"])
+    
+    total_chunks = recording_info["chunks_count"]
+    data_size = recording_info["data_size"]
+    print(f"🎵 Finalizing {total_chunks} audio chunks ({data_size} bytes) for recording {recording_id}")
+    
+    file_size = None
+    if data_size > 0:
         try:
-            print("🤖 Generating OpenAI response after call completion...")
+            print(f"✅ Saved WebM file: {webm_filepath} ({webm_size} bytes)")
             
-            # Generate bedtime story about Morocco as requested
-            bedtime_story = openai_service.generate_bedtime_story("Morocco")
+            # Use the MP3 encoded during the call, converting the WebM
+            # file only if there was no live encoder or it failed
+            encoder = recording_info.pop("encoder", None)
+            if encoder is not None and finish_mp3_encoder(encoder):
+                file_size = get_file_size(filepath)
+            elif convert_webm_to_mp3(webm_filepath, filepath):
+                file_size = get_file_size(filepath)
             
-            # Also generate a call summary
-            call_summary = openai_service.generate_call_summary(duration, final_transcription)
+            if file_size is not None:
+                print(f"🎵 MP3 file created successfully: {filepath} ({file_size} bytes)")
+                
+                # Clean up temporary WebM file
+                try:
+                    os.remove(webm_filepath)
+                    print(f"🗑️ Cleaned up temporary WebM file")
+                except Exception as cleanup_error:
+                    print(f"⚠️ Could not clean up temporary file: {cleanup_error}")
+            else:
+                print(f"❌ MP3 conversion failed, keeping WebM file")
+                # Point the recording at the WebM file instead
+                filename = recording_info["webm_filename"]
+                recording_info["filename"] = filename
+                filepath = webm_filepath
+                file_size = webm_size
             
-            openai_response = {
-                "bedtime_story": bedtime_story,
-                "call_summary": call_summary,
-                "story_output_text": bedtime_story  # This is the response.output_text equivalent
-            }
+            print(f"📁 Final file: {filepath}, size: {file_size} bytes")
             
-            print(f"🌙 Bedtime Story: {bedtime_story}")
-            print(f"📋 Call Summary: {call_summary}")
+            # Also save transcription as text file
+            if final_transcription:
+                transcript_filename = f"transcript_{recording_id}.txt"
+                transcript_filepath = os.path.join(RECORDINGS_DIR, transcript_filename)
+                with open(transcript_filepath, 'w', encoding='utf-8') as f:
+                    f.write('\n'.join(final_transcription))
+                print(f"✅ Saved transcript: {transcript_filepath}")
+                recording_info["transcript_filename"] = transcript_filename
             
-        except Exception as e:
-            print(f"❌ Error generating OpenAI response: {e}")
-            openai_response = {
-                "error": str(e),
-                "bedtime_story": "Error generating bedtime story",
-                "call_summary": f"Call completed successfully (duration: {duration:.1f}s)"
-            }
+        except Exception as audio_error:
+            print(f"❌ Error processing audio file: {audio_error}")
+            # Fallback: create a minimal file indicating an error
+            with open(filepath, 'w') as f:
+                f.write("Error processing audio chunks")
+            file_size = None
+    else:
+        # No chunks received, create empty file
+        print("⚠️ No audio chunks received")
+        encoder = recording_info.pop("encoder", None)
+        if encoder is not None:
+            finish_mp3_encoder(encoder)
+        with open(filepath, 'w') as f:
+            f.write("No audio data received")
+        try:
+            os.remove(webm_filepath)
+        except OSError:
+            pass
+    
+    recording_info["file_size"] = file_size if file_size is not None else os.stat(filepath).st_size
+    
+    # Persist the final metadata
+    recording_store.update(
+        recording_id,
+        status="completed",
+        end_time=recording_info["end_time"],
+        filename=recording_info["filename"],
+        transcript_filename=recording_info.get("transcript_filename"),
+        duration=duration,
+        file_size=recording_info["file_size"]
+    )
+    
+    # Generate OpenAI response after call ends
+    openai_response = None
+    try:
+        print("🤖 Generating OpenAI response after call completion...")
+        
+        # Generate bedtime story about Morocco as requested, and a call summary;
+        # the two requests are independent, so they run in parallel
+        story_future = openai_executor.submit(openai_service.generate_bedtime_story, "Morocco")
+        summary_future = openai_executor.submit(openai_service.generate_call_summary, filename)
+        bedtime_story = story_future.result()
+        call_summary = summary_future.result()
+        
+        openai_response = {
+            "bedtime_story": bedtime_story,
+            "call_summary": call_summary,
+            "story_output_text": bedtime_story  # This is the response.output_text equivalent
+        }
+        
+        print(f"🌙 Bedtime Story: {bedtime_story}")
+        print(f"📋 Call Summary: {call_summary}")
+        
+    except Exception as e:
+        print(f"❌ Error generating OpenAI response: {e}")
+        openai_response = {
+            "error": str(e),
+            "bedtime_story": "Error generating bedtime story",
+            "call_summary": f"Call completed successfully (duration: {duration:.1f}s)"
+        }
+    
+    recording_info["status"] = "completed"
+    return {
+        "success": True,
+        "status": "completed",
+        "recording_id": recording_id,
+        "filename": filename,
+        "duration": duration,
+        "file_size": recording_info["file_size"],
+        "download_url": f"/download/{recording_id}",
+        "transcription": final_transcription,
+        "transcript_available": bool(final_transcription),
+        "openai_response": openai_response,
+        "chat_message": openai_response.get("story_output_text") if openai_response else None
+    }
+
+@app.route('/recording/status/<recording_id>', methods=['GET'])
+def recording_status(recording_id):
+    """Report whether a recording is in progress, processing or completed"""
+    try:
+        try:
+            recording_id, key = parse_recording_id(recording_id)
+        except ValueError:
+            return jsonify({"success": False, "error": "Invalid recording id"}), 400
+        
+        if key in active_recordings:
+            return jsonify({"success": True, "recording_id": recording_id, "status": "recording"})
+        
+        if key in finalizing_recordings:
+            return jsonify({"success": True, "recording_id": recording_id, "status": "processing"})
+        
+        # The full result is handed out once; afterwards the store answers
+        with finalized_results_lock:
+            result = finalized_results.pop(key, None)
+        if result is not None:
+            return jsonify(result)
+        
+        info = recording_store.get(recording_id)
+        if info is None:
+            return jsonify({"success": False, "error": "Recording not found"}), 404
         
         return jsonify({
-            "success": True,
+            "success": info["status"] != "failed",
             "recording_id": recording_id,
-            "filename": filename,
-            "duration": duration,
-            "file_size": recording_info["file_size"],
-            "download_url": f"/download/{recording_id}",
-            "transcription": final_transcription,
-            "transcript_available": bool(final_transcription),
-            "openai_response": openai_response,
-            "chat_message": openai_response.get("story_output_text") if openai_response else None
+            "status": info["status"],
+            "filename": info["filename"],
+            "duration": info["duration"],
+            "file_size": info["file_size"],
+            "download_url": f"/download/{recording_id}"
         })
         
     except Exception as e:
@@ -502,20 +1309,35 @@ def stop_recording():
 @app.route('/download/<recording_id>')
 def download_recording(recording_id):
     try:
-        if recording_id not in active_recordings:
+        try:
+            recording_info = get_recording(recording_id)
+        except ValueError:
+            return jsonify({"error": "Invalid recording id"}), 400
+        
+        if recording_info is None:
             return jsonify({"error": "Recording not found"}), 404
         
-        recording_info = active_recordings[recording_id]
+        if recording_info["status"] == "processing":
+            return jsonify({"error": "Recording is still processing"}), 409
+        
         filepath = os.path.join(RECORDINGS_DIR, recording_info["filename"])
         
-        if not os.path.exists(filepath):
+        try:
+            st = os.stat(filepath)
+        except FileNotFoundError:
             return jsonify({"error": "File not found"}), 404
         
+        # Serve from a real path so WSGI servers with wsgi.file_wrapper can use
+        # sendfile; conditional responses let players seek with Range requests
+        filename = recording_info["filename"]
         return send_file(
-            filepath,
+            os.path.abspath(filepath),
             as_attachment=True,
-            download_name=recording_info["filename"],
-            mimetype='audio/mpeg'  # Correct MIME type for MP3 audio
+            download_name=filename,
+            mimetype='audio/webm' if filename.endswith('.webm') else 'audio/mpeg',
+            conditional=True,
+            etag=True,
+            last_modified=st.st_mtime
         )
         
     except Exception as e:
@@ -525,17 +1347,17 @@ def download_recording(recording_id):
 def list_recordings():
     try:
         recordings = []
-        for recording_id, info in active_recordings.items():
-            if info["status"] == "completed":
-                recordings.append({
-                    "id": recording_id,
-                    "filename": info["filename"],
-                    "model": info["model"],
-                    "start_time": info["start_time"],
-                    "duration": info.get("duration", 0),
-                    "file_size": info.get("file_size", 0),
-                    "download_url": f"/download/{recording_id}"
-                })
+        for info in recording_store.list_completed(limit=100):
+            recording_id = info["id"]
+            recordings.append({
+                "id": recording_id,
+                "filename": info["filename"],
+                "model": info["model"],
+                "start_time": info["start_time"],
+                "duration": info["duration"] or 0,
+                "file_size": info["file_size"] or 0,
+                "download_url": f"/download/{recording_id}"
+            })
         
         return jsonify({"recordings": recordings})
         
@@ -562,7 +1384,7 @@ def test_openai():
             "prompt": prompt,
             "response": response_text,
             "output_text": response_text,  # Equivalent to response.output_text
-            "model": config.get_openai_model()
+            "model": config.openai_model
         })
         
     except Exception as e:
@@ -592,55 +1414,112 @@ def get_bedtime_story():
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
-def create_wav_header(sample_rate=44100, channels=2, duration_seconds=1):
-    """Create a basic WAV file header"""
-    data_size = sample_rate * channels * 2 * duration_seconds  # 16-bit samples
-    file_size = data_size + 36
+def ai_event_stream(deltas):
+    """Wrap generated text deltas as a server-sent event stream"""
+    def generate_ai_stream():
+        for delta in deltas:
+            yield f"data: {app.json.dumps({'delta': delta})}\n\n"
+        yield f"data: {app.json.dumps({'done': True})}\n\n"
+    
+    return Response(
+        generate_ai_stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/ai/test/stream', methods=['POST'])
+def stream_test_openai():
+    """Stream the custom response of the OpenAI test endpoint as it is generated"""
+    data = request.get_json(silent=True) or {}
+    prompt = data.get('prompt', 'Write a one-sentence bedtime story about Morocco.')
+    
+    if not openai_service.is_available():
+        return jsonify({
+            "success": False, 
+            "error": "OpenAI service not available. Check API key configuration."
+        }), 400
+    
+    return ai_event_stream(openai_service.stream_custom_response(prompt))
+
+@app.route('/ai/bedtime-story/stream', methods=['GET'])
+def stream_bedtime_story():
+    """Stream a bedtime story as it is generated"""
+    location = request.args.get('location', 'Morocco')
+    
+    if not openai_service.is_available():
+        return jsonify({
+            "success": False, 
+            "error": "OpenAI service not available. Check API key configuration."
+        }), 400
     
-    header = bytearray(44)
+    return ai_event_stream(openai_service.stream_bedtime_story(location))
+
+# ffmpeg arguments for the MP3 output, shared by live and file conversion
+MP3_OUTPUT_ARGS = (
+    '-acodec', 'mp3',              # Audio codec: MP3
+    '-ab', '128k',                 # Audio bitrate: 128 kbps
+    '-ar', '44100',                # Sample rate: 44.1 kHz
+    '-y',                          # Overwrite output file
+)
+
+def start_mp3_encoder(mp3_filepath):
+    """Start ffmpeg encoding WebM from its stdin into an MP3 file
+    
+    Returns an EncoderFeeder for the process, or None if ffmpeg is
+    unavailable. Its stdin is unbuffered since the feeder writes the fd.
+    """
+    if FFMPEG_BIN is None:
+        return None
+    
+    try:
+        process = subprocess.Popen(
+            [FFMPEG_BIN, '-loglevel', 'error', '-i', 'pipe:0', *MP3_OUTPUT_ARGS, mp3_filepath],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            bufsize=0
+        )
+    except OSError as e:
+        print(f"❌ Could not start live MP3 encoder: {e}")
+        return None
     
-    # RIFF header
-    header[0:4] = b'RIFF'
-    header[4:8] = file_size.to_bytes(4, 'little')
-    header[8:12] = b'WAVE'
+    return EncoderFeeder(process)
+
+def finish_mp3_encoder(encoder, timeout=60):
+    """Wait for a live encoder that has been closed; True on success
     
-    # fmt chunk
-    header[12:16] = b'fmt '
-    header[16:20] = (16).to_bytes(4, 'little')  # fmt chunk size
-    header[20:22] = (1).to_bytes(2, 'little')   # audio format (PCM)
-    header[22:24] = channels.to_bytes(2, 'little')
-    header[24:28] = sample_rate.to_bytes(4, 'little')
-    header[28:32] = (sample_rate * channels * 2).to_bytes(4, 'little')  # byte rate
-    header[32:34] = (channels * 2).to_bytes(2, 'little')  # block align
-    header[34:36] = (16).to_bytes(2, 'little')  # bits per sample
+    Its output is discarded; on failure the WebM file is converted instead,
+    which reports ffmpeg's errors.
+    """
+    try:
+        returncode = encoder.process.wait(timeout=timeout)
+    except subprocess.TimeoutExpired:
+        encoder.process.kill()
+        encoder.process.wait()
+        print("❌ Live MP3 encoder timed out")
+        return False
     
-    # data chunk
-    header[36:40] = b'data'
-    header[40:44] = data_size.to_bytes(4, 'little')
+    if encoder.failed:
+        return False
     
-    return bytes(header)
+    if returncode != 0:
+        print(f"❌ Live MP3 encoding failed (exit code {returncode})")
+    return returncode == 0
 
 def convert_webm_to_mp3(webm_filepath, mp3_filepath):
     """Convert WebM audio file to MP3 using ffmpeg"""
+    if FFMPEG_BIN is None:
+        print("❌ ffmpeg not found. Please install it to enable MP3 conversion.")
+        return False
+    
     try:
-        # Check if ffmpeg is available
-        result = subprocess.run(['which', 'ffmpeg'], capture_output=True, text=True)
-        if result.returncode != 0:
-            print("❌ ffmpeg not found. Installing ffmpeg...")
-            # Try to install ffmpeg
-            install_result = subprocess.run(['apt-get', 'update', '&&', 'apt-get', 'install', '-y', 'ffmpeg'], 
-                                          shell=True, capture_output=True, text=True)
-            if install_result.returncode != 0:
-                raise Exception("Could not install ffmpeg. Please install it manually.")
-        
         # Convert WebM to MP3 using ffmpeg
         cmd = [
-            'ffmpeg', 
+            FFMPEG_BIN, 
+            '-loglevel', 'error',          # Only report errors
+            '-nostdin',                    # Never wait for console input
             '-i', webm_filepath,           # Input WebM file
-            '-acodec', 'mp3',              # Audio codec: MP3
-            '-ab', '128k',                 # Audio bitrate: 128 kbps
-            '-ar', '44100',                # Sample rate: 44.1 kHz
-            '-y',                          # Overwrite output file
+            *MP3_OUTPUT_ARGS,
             mp3_filepath                   # Output MP3 file
         ]
         
@@ -658,6 +1537,8 @@ def convert_webm_to_mp3(webm_filepath, mp3_filepath):
         print(f"❌ Error converting to MP3: {e}")
         return False
 
+# Development server only; in production run the WSGI entry point instead:
+#   gunicorn -k gthread -w 1 --threads 16 -b 0.0.0.0:3001 wsgi:application
 if __name__ == '__main__':
     print("🚀 Starting Sphere AI Clone Audio Recording Backend...")
     print("📁 Recordings will be saved in:", os.path.abspath(RECORDINGS_DIR))
@@ -671,17 +1552,16 @@ if __name__ == '__main__':
             print(f"    {key}: {value}")
     
     # Check API key availability
-    ai_providers = config.get_available_ai_providers()
-    available_providers = [provider for provider, available in ai_providers.items() if available]
+    available_providers = sorted(config.get_available_ai_providers())
     if available_providers:
         print(f"\n🔑 Available AI providers: {', '.join(available_providers)}")
     else:
         print("\n⚠️ No AI API keys configured. Add your API keys to .env.local")
     
-    print(f"\n🌐 Server starting on http://{config.get_flask_host()}:{config.get_flask_port()}")
+    print(f"\n🌐 Server starting on http://{config.flask_host}:{config.flask_port}")
     
     app.run(
-        host=config.get_flask_host(), 
-        port=config.get_flask_port(), 
-        debug=config.get_flask_debug()
+        host=config.flask_host, 
+        port=config.flask_port, 
+        debug=config.flask_debug
     )
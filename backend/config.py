@@ -4,68 +4,303 @@ Handles loading and validation of environment variables and API keys
 """
 
 import os
-from dotenv import load_dotenv
-from typing import Optional, Dict, Any
+import re
+import functools
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional, Dict, Any, FrozenSet, Mapping, Tuple
 import warnings
 
+# python-dotenv is optional; it only handles .env features _parse_env lacks
+try:
+    from dotenv import dotenv_values
+except ImportError:
+    dotenv_values = None
+
+# Load and validation messages; shown per LOG_LEVEL (see configure_logging)
+logger = logging.getLogger(__name__)
+
+# LOG_LEVEL values understood by logging; anything else falls back to INFO
+_LOG_LEVELS = frozenset({'CRITICAL', 'ERROR', 'WARNING', 'INFO', 'DEBUG'})
+
+# Backend modules whose loggers follow LOG_LEVEL
+_SERVICE_LOGGERS = ('config', 'openai_service', 'http_pool')
+_service_handler = None
+
+def configure_logging(log_level: str):
+    """Point the backend service loggers at stderr at the given level"""
+    global _service_handler
+    if _service_handler is None:
+        _service_handler = logging.StreamHandler()
+        _service_handler.setFormatter(logging.Formatter('%(message)s'))
+    
+    for name in _SERVICE_LOGGERS:
+        service_log = logging.getLogger(name)
+        service_log.setLevel(log_level)
+        if not service_log.handlers:
+            service_log.addHandler(_service_handler)
+            service_log.propagate = False
+
+# .env files are parsed at most once per process (see reset_dotenv_cache)
+_DOTENV_LOADED = False
+
+# Project root is the parent of backend
+_BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+_PROJECT_ROOT = os.path.dirname(_BACKEND_DIR)
+
+# (label, path, overrides process env) in priority order, resolved once at import:
+# .env.local holds the actual secrets, .env the defaults, backend/.env extras
+_ENV_FILES = tuple(
+    entry for entry in (
+        ('.env.local', os.path.join(_PROJECT_ROOT, '.env.local'), True),
+        ('.env', os.path.join(_PROJECT_ROOT, '.env'), False),
+        ('backend .env', os.path.join(_BACKEND_DIR, '.env'), False),
+    )
+    if os.path.exists(entry[1])
+)
+
+# Unquoted values end at whitespace followed by '#', as in python-dotenv
+_INLINE_COMMENT = re.compile(r'\s+#')
+
+def _parse_env(path: str) -> Dict[str, str]:
+    """Parse a simple KEY=VALUE .env file in a single pass
+    
+    Supports blank and comment lines, an optional 'export ' prefix, single-
+    and double-quoted values and unquoted values with trailing ' # comments'.
+    Not supported: ${VAR} expansion, backslash escapes in double quotes and
+    multi-line quoted values. A file using any of these is handed to
+    python-dotenv when it is installed; otherwise such values are kept as
+    written.
+    """
+    values = {}
+    needs_dotenv = False
+    with open(path, encoding='utf-8') as env_file:
+        for line in env_file.read().splitlines():
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('export '):
+                line = line[7:]
+            
+            key, sep, value = line.partition('=')
+            key = key.strip()
+            if not sep or not key:
+                continue
+            
+            value = value.strip()
+            quote = value[:1]
+            if quote in ('"', "'"):
+                # Anything after the closing quote is a comment
+                end = value.find(quote, 1)
+                if end == -1:
+                    needs_dotenv = True
+                    value = value[1:]
+                else:
+                    value = value[1:end]
+                    if quote == '"' and ('\\' in value or '${' in value):
+                        needs_dotenv = True
+            else:
+                comment = _INLINE_COMMENT.search(value)
+                if comment:
+                    value = value[:comment.start()]
+                if '${' in value:
+                    needs_dotenv = True
+            values[key] = value
+    
+    if needs_dotenv and dotenv_values is not None:
+        return {key: value for key, value in dotenv_values(path).items() if value is not None}
+    return values
+
+def reset_dotenv_cache():
+    """Allow the next EnvironmentConfig to load the .env files again"""
+    global _DOTENV_LOADED
+    _DOTENV_LOADED = False
+
+# Values a boolean setting accepts as enabled; anything else is off
+_TRUTHY = frozenset({'1', 'true', 'True', 'TRUE', 'yes', 'Yes', 'YES', 'on', 'On', 'ON'})
+
+# AI providers and the variable holding each one's API key, in display order
+_AI_PROVIDER_KEYS = (
+    ('openai', 'OPENAI_API_KEY'),
+    ('anthropic', 'ANTHROPIC_API_KEY'),
+    ('google', 'GOOGLE_API_KEY'),
+)
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    """Immutable snapshot of every setting, parsed once from the environment"""
+    
+    # AI/LLM API keys and models
+    openai_api_key: Optional[str]
+    openai_org_id: Optional[str]
+    openai_model: str
+    anthropic_api_key: Optional[str]
+    anthropic_model: str
+    google_api_key: Optional[str]
+    gemini_model: str
+    
+    # Speech & audio APIs
+    whisper_api_key: Optional[str]
+    google_speech_api_key: Optional[str]
+    google_speech_project_id: Optional[str]
+    azure_speech_key: Optional[str]
+    azure_speech_region: Optional[str]
+    
+    # Server
+    flask_port: int
+    flask_host: str
+    flask_debug: bool
+    recordings_dir: str
+    recordings_db_path: str
+    max_chunk_size: int
+    cors_origins: Tuple[str, ...]
+    
+    # Audio processing
+    max_recording_duration: int
+    audio_sample_rate: int
+    audio_format: str
+    max_transcript_phrases: int
+    
+    # Utility
+    development: bool
+    log_level: str
+    audio_debug: bool
+    
+    # Names of the AI providers that have an API key set
+    available_ai_providers: FrozenSet[str]
+
+def _parse_log_level(value: str) -> str:
+    """Normalize a LOG_LEVEL value, falling back to INFO if it is unknown"""
+    level = value.strip().upper()
+    return level if level in _LOG_LEVELS else 'INFO'
+
+def build_settings(env: Optional[Mapping[str, str]] = None) -> Settings:
+    """Parse the environment (os.environ by default) into a Settings snapshot"""
+    if env is None:
+        env = dict(os.environ)
+    
+    openai_api_key = env.get('OPENAI_API_KEY')
+    google_api_key = env.get('GOOGLE_API_KEY')
+    recordings_dir = env.get('RECORDINGS_DIR', 'recordings')
+    cors_origins = env.get('CORS_ORIGINS', 'http://localhost:8080,http://localhost:3000')
+    
+    return Settings(
+        openai_api_key=openai_api_key,
+        openai_org_id=env.get('OPENAI_ORG_ID'),
+        openai_model=env.get('OPENAI_MODEL', 'gpt-4'),
+        anthropic_api_key=env.get('ANTHROPIC_API_KEY'),
+        anthropic_model=env.get('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229'),
+        google_api_key=google_api_key,
+        gemini_model=env.get('GEMINI_MODEL', 'gemini-pro'),
+        # Speech keys fall back to the provider's main key
+        whisper_api_key=env.get('OPENAI_WHISPER_API_KEY') or openai_api_key,
+        google_speech_api_key=env.get('GOOGLE_SPEECH_API_KEY') or google_api_key,
+        google_speech_project_id=env.get('GOOGLE_SPEECH_PROJECT_ID'),
+        azure_speech_key=env.get('AZURE_SPEECH_KEY'),
+        azure_speech_region=env.get('AZURE_SPEECH_REGION'),
+        flask_port=int(env.get('FLASK_PORT', '3001')),
+        flask_host=env.get('FLASK_HOST', '0.0.0.0'),
+        # Debug stays off unless FLASK_DEBUG is set
+        flask_debug=env.get('FLASK_DEBUG', 'False') in _TRUTHY,
+        recordings_dir=recordings_dir,
+        recordings_db_path=env.get('RECORDINGS_DB', os.path.join(recordings_dir, 'recordings.db')),
+        max_chunk_size=int(env.get('MAX_CHUNK_SIZE', str(2 * 1024 * 1024))),
+        cors_origins=tuple(origin.strip() for origin in cors_origins.split(',')),
+        max_recording_duration=int(env.get('MAX_RECORDING_DURATION', '300')),
+        audio_sample_rate=int(env.get('AUDIO_SAMPLE_RATE', '16000')),
+        audio_format=env.get('AUDIO_FORMAT', 'mp3'),
+        max_transcript_phrases=int(env.get('MAX_TRANSCRIPT_PHRASES', '500')),
+        development=env.get('DEV_MODE', 'true') in _TRUTHY,
+        log_level=_parse_log_level(env.get('LOG_LEVEL', 'INFO')),
+        audio_debug=env.get('ENABLE_AUDIO_DEBUG', 'false') in _TRUTHY,
+        available_ai_providers=frozenset(
+            provider for provider, key_var in _AI_PROVIDER_KEYS if env.get(key_var)
+        ),
+    )
+
 class EnvironmentConfig:
     """Handles environment configuration and API key management"""
     
     def __init__(self):
         """Initialize environment configuration"""
-        # Load environment variables from .env files
-        self._load_environment()
+        # Load environment variables from .env files; LOG_LEVEL may come from
+        # them, so their messages are held back until logging is set up
+        load_messages = self._load_environment()
+        
+        # Parse everything once; getters read from this snapshot
+        self.settings = build_settings()
+        
+        configure_logging(self.settings.log_level)
+        for level, message, args in load_messages:
+            logger.log(level, message, *args)
         
         # Validate required configurations
         self._validate_config()
     
     def _load_environment(self):
-        """Load environment variables from .env files"""
+        """Load environment variables from .env files
+        
+        Returns the (level, message, args) log entries for the caller to emit.
+        """
+        global _DOTENV_LOADED
+        messages = []
+        if _DOTENV_LOADED:
+            return messages
+        
         try:
-            # Get the project root directory (parent of backend)
-            project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            
-            # Load from .env.local first (highest priority - actual secrets)
-            env_local_path = os.path.join(project_root, '.env.local')
-            if os.path.exists(env_local_path):
-                load_dotenv(env_local_path, override=True)
-                print(f"✅ Loaded .env.local from {env_local_path}")
-            
-            # Load from .env (default configuration)
-            env_path = os.path.join(project_root, '.env')
-            if os.path.exists(env_path):
-                load_dotenv(env_path, override=False)
-                print(f"✅ Loaded .env from {env_path}")
+            # Overriding files apply directly; the rest only fill in missing
+            # keys, with earlier files winning over later ones
+            defaults = {}
+            for label, path, override in _ENV_FILES:
+                values = _parse_env(path)
+                if override:
+                    os.environ.update(values)
+                else:
+                    for key, value in values.items():
+                        defaults.setdefault(key, value)
+                messages.append((logging.DEBUG, "✅ Loaded %s from %s", (label, path)))
             
-            # Also load from backend/.env if it exists
-            backend_env_path = os.path.join(os.path.dirname(__file__), '.env')
-            if os.path.exists(backend_env_path):
-                load_dotenv(backend_env_path, override=False)
-                print(f"✅ Loaded backend .env from {backend_env_path}")
+            for key, value in defaults.items():
+                os.environ.setdefault(key, value)
             
-            print("✅ Environment variables loaded successfully")
+            messages.append((logging.DEBUG, "✅ Environment variables loaded successfully", ()))
+            _DOTENV_LOADED = True
             
         except Exception as e:
-            print(f"⚠️ Warning: Could not load .env files: {e}")
+            messages.append((logging.WARNING, "⚠️ Warning: Could not load .env files: %s", (e,)))
+        
+        return messages
+    
+    def invalidate(self):
+        """Rebuild the settings snapshot from the current environment"""
+        self.settings = build_settings()
+        configure_logging(self.settings.log_level)
+        self.__dict__.pop('config_summary', None)
+    
+    def __getattr__(self, name: str):
+        """Expose settings as plain attributes (config.openai_api_key)"""
+        if name == 'settings':
+            raise AttributeError(name)
+        return getattr(self.settings, name)
     
     def _validate_config(self):
         """Validate that required environment variables are set"""
         missing_vars = []
         
         # Check for at least one AI API key
-        ai_keys = [
-            self.get_openai_api_key(),
-            self.get_anthropic_api_key(),
-            self.get_google_api_key()
-        ]
-        
-        if not any(ai_keys):
+        settings = self.settings
+        if not settings.available_ai_providers:
             missing_vars.append("At least one AI API key (OpenAI, Anthropic, or Google)")
         
+        raw_level = os.environ.get('LOG_LEVEL')
+        if raw_level and raw_level.strip().upper() not in _LOG_LEVELS:
+            logger.warning("⚠️ Unknown LOG_LEVEL %r, using INFO", raw_level)
+        
         if missing_vars:
             warning_msg = f"⚠️ Missing environment variables: {', '.join(missing_vars)}"
             warnings.warn(warning_msg)
-            print(warning_msg)
+            logger.warning(warning_msg)
     
     # =============================================================================
     # AI/LLM API KEY GETTERS
@@ -73,31 +308,31 @@ class EnvironmentConfig:
     
     def get_openai_api_key(self) -> Optional[str]:
         """Get OpenAI API key"""
-        return os.getenv('OPENAI_API_KEY')
+        return self.settings.openai_api_key
     
     def get_openai_org_id(self) -> Optional[str]:
         """Get OpenAI Organization ID"""
-        return os.getenv('OPENAI_ORG_ID')
+        return self.settings.openai_org_id
     
     def get_openai_model(self) -> str:
         """Get OpenAI model name"""
-        return os.getenv('OPENAI_MODEL', 'gpt-4')
+        return self.settings.openai_model
     
     def get_anthropic_api_key(self) -> Optional[str]:
         """Get Anthropic API key"""
-        return os.getenv('ANTHROPIC_API_KEY')
+        return self.settings.anthropic_api_key
     
     def get_anthropic_model(self) -> str:
         """Get Anthropic model name"""
-        return os.getenv('ANTHROPIC_MODEL', 'claude-3-sonnet-20240229')
+        return self.settings.anthropic_model
     
     def get_google_api_key(self) -> Optional[str]:
         """Get Google API key"""
-        return os.getenv('GOOGLE_API_KEY')
+        return self.settings.google_api_key
     
     def get_gemini_model(self) -> str:
         """Get Gemini model name"""
-        return os.getenv('GEMINI_MODEL', 'gemini-pro')
+        return self.settings.gemini_model
     
     # =============================================================================
     # SPEECH & AUDIO API CONFIGURATION
@@ -105,23 +340,23 @@ class EnvironmentConfig:
     
     def get_whisper_api_key(self) -> Optional[str]:
         """Get OpenAI Whisper API key (usually same as OpenAI API key)"""
-        return os.getenv('OPENAI_WHISPER_API_KEY') or self.get_openai_api_key()
+        return self.settings.whisper_api_key
     
     def get_google_speech_api_key(self) -> Optional[str]:
         """Get Google Speech API key"""
-        return os.getenv('GOOGLE_SPEECH_API_KEY') or self.get_google_api_key()
+        return self.settings.google_speech_api_key
     
     def get_google_speech_project_id(self) -> Optional[str]:
         """Get Google Cloud Project ID for Speech-to-Text"""
-        return os.getenv('GOOGLE_SPEECH_PROJECT_ID')
+        return self.settings.google_speech_project_id
     
     def get_azure_speech_key(self) -> Optional[str]:
         """Get Azure Speech Services key"""
-        return os.getenv('AZURE_SPEECH_KEY')
+        return self.settings.azure_speech_key
     
     def get_azure_speech_region(self) -> Optional[str]:
         """Get Azure Speech Services region"""
-        return os.getenv('AZURE_SPEECH_REGION')
+        return self.settings.azure_speech_region
     
     # =============================================================================
     # SERVER CONFIGURATION
@@ -129,24 +364,31 @@ class EnvironmentConfig:
     
     def get_flask_port(self) -> int:
         """Get Flask server port"""
-        return int(os.getenv('FLASK_PORT', '3001'))
+        return self.settings.flask_port
     
     def get_flask_host(self) -> str:
         """Get Flask server host"""
-        return os.getenv('FLASK_HOST', '0.0.0.0')
+        return self.settings.flask_host
     
     def get_flask_debug(self) -> bool:
-        """Get Flask debug mode"""
-        return os.getenv('FLASK_DEBUG', 'True').lower() == 'true'
+        """Get Flask debug mode (off unless FLASK_DEBUG is set)"""
+        return self.settings.flask_debug
     
     def get_recordings_dir(self) -> str:
         """Get recordings directory"""
-        return os.getenv('RECORDINGS_DIR', 'recordings')
+        return self.settings.recordings_dir
     
-    def get_cors_origins(self) -> list:
+    def get_recordings_db_path(self) -> str:
+        """Get path of the SQLite recording metadata database"""
+        return self.settings.recordings_db_path
+    
+    def get_max_chunk_size(self) -> int:
+        """Get maximum size in bytes of a single uploaded request body"""
+        return self.settings.max_chunk_size
+    
+    def get_cors_origins(self) -> Tuple[str, ...]:
         """Get CORS allowed origins"""
-        origins = os.getenv('CORS_ORIGINS', 'http://localhost:8080,http://localhost:3000')
-        return [origin.strip() for origin in origins.split(',')]
+        return self.settings.cors_origins
     
     # =============================================================================
     # AUDIO PROCESSING CONFIGURATION
@@ -154,15 +396,19 @@ class EnvironmentConfig:
     
     def get_max_recording_duration(self) -> int:
         """Get maximum recording duration in seconds"""
-        return int(os.getenv('MAX_RECORDING_DURATION', '300'))
+        return self.settings.max_recording_duration
     
     def get_audio_sample_rate(self) -> int:
         """Get audio sample rate"""
-        return int(os.getenv('AUDIO_SAMPLE_RATE', '16000'))
+        return self.settings.audio_sample_rate
     
     def get_audio_format(self) -> str:
         """Get audio output format"""
-        return os.getenv('AUDIO_FORMAT', 'mp3')
+        return self.settings.audio_format
+    
+    def get_max_transcript_phrases(self) -> int:
+        """Get how many finalized phrases live transcription views carry"""
+        return self.settings.max_transcript_phrases
     
     # =============================================================================
     # UTILITY METHODS
@@ -170,55 +416,78 @@ class EnvironmentConfig:
     
     def is_development(self) -> bool:
         """Check if running in development mode"""
-        return os.getenv('DEV_MODE', 'true').lower() == 'true'
+        return self.settings.development
     
     def get_log_level(self) -> str:
         """Get logging level"""
-        return os.getenv('LOG_LEVEL', 'INFO')
+        return self.settings.log_level
     
     def is_audio_debug_enabled(self) -> bool:
         """Check if audio debug logging is enabled"""
-        return os.getenv('ENABLE_AUDIO_DEBUG', 'false').lower() == 'true'
+        return self.settings.audio_debug
     
-    def get_available_ai_providers(self) -> Dict[str, bool]:
-        """Get list of available AI providers based on API keys"""
-        return {
-            'openai': bool(self.get_openai_api_key()),
-            'anthropic': bool(self.get_anthropic_api_key()),
-            'google': bool(self.get_google_api_key()),
-        }
+    def get_available_ai_providers(self) -> FrozenSet[str]:
+        """Get the names of the AI providers that have an API key configured"""
+        return self.settings.available_ai_providers
     
     def get_config_summary(self) -> Dict[str, Any]:
         """Get a summary of current configuration (without exposing secrets)"""
+        return self.config_summary
+    
+    @functools.cached_property
+    def config_summary(self) -> Dict[str, Any]:
+        """Configuration summary, built once per settings snapshot (treat as read-only)"""
+        settings = self.settings
         return {
             'server': {
-                'host': self.get_flask_host(),
-                'port': self.get_flask_port(),
-                'debug': self.get_flask_debug(),
-                'development': self.is_development()
+                'host': settings.flask_host,
+                'port': settings.flask_port,
+                'debug': settings.flask_debug,
+                'development': settings.development
             },
             'audio': {
-                'format': self.get_audio_format(),
-                'sample_rate': self.get_audio_sample_rate(),
-                'max_duration': self.get_max_recording_duration(),
-                'recordings_dir': self.get_recordings_dir()
+                'format': settings.audio_format,
+                'sample_rate': settings.audio_sample_rate,
+                'max_duration': settings.max_recording_duration,
+                'max_transcript_phrases': settings.max_transcript_phrases,
+                'recordings_dir': settings.recordings_dir,
+                'recordings_db': settings.recordings_db_path
+            },
+            'ai_providers': {
+                provider: provider in settings.available_ai_providers
+                for provider, _ in _AI_PROVIDER_KEYS
             },
-            'ai_providers': self.get_available_ai_providers(),
             'logging': {
-                'level': self.get_log_level(),
-                'audio_debug': self.is_audio_debug_enabled()
+                'level': settings.log_level,
+                'audio_debug': settings.audio_debug
             }
         }
 
-# Global configuration instance
-config = EnvironmentConfig()
+# Global configuration instance, created on first use by get_config()
+_instance: Optional[EnvironmentConfig] = None
+_instance_lock = threading.Lock()
+
+def get_config() -> EnvironmentConfig:
+    """Get the shared configuration, loading .env files on first call"""
+    global _instance
+    if _instance is None:
+        with _instance_lock:
+            if _instance is None:
+                _instance = EnvironmentConfig()
+    return _instance
+
+def __getattr__(name: str):
+    """Keep `from config import config` working without an import-time load"""
+    if name == 'config':
+        return get_config()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # Convenience functions for backward compatibility
 def get_openai_api_key() -> Optional[str]:
-    return config.get_openai_api_key()
+    return get_config().settings.openai_api_key
 
 def get_anthropic_api_key() -> Optional[str]:
-    return config.get_anthropic_api_key()
+    return get_config().settings.anthropic_api_key
 
 def get_google_api_key() -> Optional[str]:
-    return config.get_google_api_key()
+    return get_config().settings.google_api_key
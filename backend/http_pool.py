@@ -0,0 +1,50 @@
+"""
+Shared HTTP Connection Pool for Sphere AI Clone Backend
+One async HTTP client handed to every outbound API client, so OpenAI and
+any later provider services reuse the same keep-alive connections
+"""
+
+import logging
+import threading
+
+from openai import DefaultAsyncHttpxClient, Timeout
+
+# Limits comes from whichever HTTP library this OpenAI SDK is built on
+try:
+    from httpx2 import Limits
+except ImportError:
+    from httpx import Limits
+
+# HTTP/2 needs the optional h2 package
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+def get_shared_http_client() -> DefaultAsyncHttpxClient:
+    """Get the process-wide async HTTP client, creating it on first use
+    
+    The client must only be used from the OpenAI service event loop, which
+    every async API client in the backend runs on.
+    """
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                client_kwargs = dict(
+                    limits=Limits(max_keepalive_connections=20, max_connections=40),
+                    timeout=Timeout(30.0, connect=5.0)
+                )
+                if HTTP2_AVAILABLE:
+                    client_kwargs['http2'] = True
+                
+                # The SDK's client subclass keeps its defaults (redirects etc.)
+                _shared_client = DefaultAsyncHttpxClient(**client_kwargs)
+                logger.debug("🌐 Shared HTTP client created (HTTP/2: %s)", HTTP2_AVAILABLE)
+    return _shared_client
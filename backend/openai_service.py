@@ -2,198 +2,303 @@
 OpenAI API Integration for Sphere AI Clone
 Handles OpenAI API calls for chat completion and text generation
 Respects rate limits: 3 requests per minute
+Requests run on a shared asyncio loop so rate-limit waits don't hold threads
 """
 
-from openai import OpenAI
-from config import config
+from openai import AsyncOpenAI
+from config import get_config
+from http_pool import get_shared_http_client
+import asyncio
+import hashlib
 import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
 import time
-from datetime import datetime, timedelta
+from array import array
+
+# Shown per LOG_LEVEL (see config.configure_logging)
+logger = logging.getLogger(__name__)
+
+# System messages are the same for every request, so they are built once;
+# only the user message is created per call
+_SYS_BEDTIME = {
+    "role": "system",
+    "content": "You are a creative storyteller who writes beautiful, gentle bedtime stories. Create only one sentence that is magical and soothing."
+}
+_SYS_SUMMARY = {
+    "role": "system",
+    "content": "You are a creative writer who imagines interesting conversations. Create brief, family-friendly summaries that are whimsical and positive."
+}
+_SYS_CUSTOM = {
+    "role": "system",
+    "content": "You are a helpful and creative assistant."
+}
+
+_UNAVAILABLE_MESSAGE = "OpenAI service is not available. Please check your API key configuration."
+
+_BEDTIME_TEMPLATE = "Write a one-sentence bedtime story about {location}."
+_SUMMARY_TEMPLATE = "Generate a brief, creative summary of what might have been discussed in a phone call that was recorded as '{audio_file_name}'. Make it whimsical and imaginative."
+
+# Stable prompt cache key sent with every request, so requests sharing a
+# prefix are routed together and can reuse OpenAI's cached prefix
+_PROMPT_CACHE_KEY = hashlib.sha256(b'sphere-ai-clone').hexdigest()[:16]
+
+# Message builders keep the fixed system prefix first and identical on every
+# call; only the trailing user message varies
+def _messages_for_bedtime(location: str):
+    return [_SYS_BEDTIME, {"role": "user", "content": _BEDTIME_TEMPLATE.format(location=location)}]
+
+def _messages_for_summary(audio_file_name: str):
+    return [_SYS_SUMMARY, {"role": "user", "content": _SUMMARY_TEMPLATE.format(audio_file_name=audio_file_name)}]
+
+def _messages_for_custom(prompt: str):
+    return [_SYS_CUSTOM, {"role": "user", "content": prompt}]
 
 class OpenAIService:
     """Service to handle OpenAI API interactions with rate limiting"""
     
+    # Clients shared by every instance, keyed by (api_key, org_id)
+    _client_cache: Dict[Tuple[str, Optional[str]], AsyncOpenAI] = {}
+    
+    # Event loop the async clients are bound to, run on a daemon thread
+    _loop: Optional[asyncio.AbstractEventLoop] = None
+    _loop_lock = threading.Lock()
+    
     def __init__(self):
         """Initialize OpenAI client"""
-        self.api_key = config.get_openai_api_key()
+        config = get_config()
+        self.api_key = config.openai_api_key
         self.client = None
-        self.model = config.get_openai_model()
+        self.model = config.openai_model
+        
+        # Fixed create() arguments per request kind, applied as one splat
+        base_kwargs = dict(model=self.model, stream=True, prompt_cache_key=_PROMPT_CACHE_KEY)
+        self._bedtime_kwargs = dict(base_kwargs, max_tokens=100, temperature=0.8)
+        self._summary_kwargs = dict(base_kwargs, max_tokens=80, temperature=0.7)
+        self._custom_kwargs = dict(base_kwargs, max_tokens=150, temperature=0.8)
         
         # Rate limiting: 3 requests per minute
         self.max_requests_per_minute = 3
-        self.request_timestamps = []
+        # Ring of the monotonic times of the last N requests; the slot at
+        # _slot_index is the oldest and the next one to be overwritten
+        self._slots = array('d', [float('-inf')] * self.max_requests_per_minute)
+        self._slot_index = 0
         
         if self.api_key:
             try:
                 # Only include organization if it's explicitly set and valid
-                org_id = config.get_openai_org_id()
-                if org_id and org_id != "your_openai_org_id_here":
-                    self.client = OpenAI(api_key=self.api_key, organization=org_id)
-                    print(f"✅ OpenAI client initialized with organization: {org_id}")
-                else:
-                    self.client = OpenAI(api_key=self.api_key)
-                    print("✅ OpenAI client initialized successfully (no organization)")
+                org_id = config.openai_org_id
+                if not org_id or org_id == "your_openai_org_id_here":
+                    org_id = None
+                
+                # Reuse the client (and its connection pool) for the same credentials
+                key = (self.api_key, org_id)
+                self.client = OpenAIService._client_cache.get(key)
+                if self.client is None:
+                    # All clients share one connection pool (see http_pool)
+                    http_client = get_shared_http_client()
+                    if org_id:
+                        client = AsyncOpenAI(api_key=self.api_key, organization=org_id, http_client=http_client)
+                        logger.debug("✅ OpenAI client initialized with organization: %s", org_id)
+                    else:
+                        client = AsyncOpenAI(api_key=self.api_key, http_client=http_client)
+                        logger.debug("✅ OpenAI client initialized successfully (no organization)")
+                    self.client = OpenAIService._client_cache.setdefault(key, client)
                     
             except Exception as e:
-                print(f"❌ Failed to initialize OpenAI client: {e}")
+                logger.error("❌ Failed to initialize OpenAI client: %s", e)
                 self.client = None
         else:
-            print("⚠️ No OpenAI API key found in environment variables")
+            logger.warning("⚠️ No OpenAI API key found in environment variables")
+        
+        # A client is only ever created when there is an API key
+        self._available = self.client is not None
+        
+        # Without a client, swap in stubs once instead of checking on every call
+        if not self._available:
+            self._bind_unavailable()
     
     def _can_make_request(self) -> bool:
         """Check if we can make a request without exceeding rate limit"""
-        now = datetime.now()
+        now = time.monotonic()
+        oldest = self._slots[self._slot_index]
         
-        # Remove timestamps older than 1 minute
-        self.request_timestamps = [
-            timestamp for timestamp in self.request_timestamps 
-            if now - timestamp < timedelta(minutes=1)
-        ]
-        
-        # Check if we're under the limit
-        can_request = len(self.request_timestamps) < self.max_requests_per_minute
+        # Only the oldest of the last N requests matters
+        can_request = now - oldest >= 60.0
         
         if not can_request:
-            oldest_request = min(self.request_timestamps)
-            wait_time = 60 - (now - oldest_request).total_seconds()
-            print(f"⏰ Rate limit reached. Need to wait {wait_time:.1f} seconds")
+            wait_time = 60 - (now - oldest)
+            logger.debug("⏰ Rate limit reached. Need to wait %.1f seconds", wait_time)
         
         return can_request
     
     def _record_request(self):
         """Record that we made a request"""
-        self.request_timestamps.append(datetime.now())
-        remaining = self.max_requests_per_minute - len(self.request_timestamps)
-        print(f"📊 Requests remaining this minute: {remaining}")
-    
-    def _wait_for_rate_limit(self):
-        """Wait if necessary to respect rate limit"""
-        if not self._can_make_request():
-            now = datetime.now()
-            oldest_request = min(self.request_timestamps)
-            wait_time = 60 - (now - oldest_request).total_seconds()
+        now = time.monotonic()
+        self._slots[self._slot_index] = now
+        self._slot_index = (self._slot_index + 1) % self.max_requests_per_minute
+        
+        # Counting the remaining budget is only needed for the debug message
+        if logger.isEnabledFor(logging.DEBUG):
+            recent = sum(1 for timestamp in self._slots if now - timestamp < 60.0)
+            remaining = self.max_requests_per_minute - recent
+            logger.debug("📊 Requests remaining this minute: %d", remaining)
+    
+    async def _wait_for_rate_limit(self):
+        """Wait until a request slot is free, then claim it"""
+        # Only the service loop touches the slots, so nothing can slip
+        # in between the check and the claim
+        while not self._can_make_request():
+            wait_time = 60 - (time.monotonic() - self._slots[self._slot_index])
             
-            print(f"⏳ Waiting {wait_time:.1f} seconds for rate limit...")
-            time.sleep(wait_time + 1)  # Add 1 second buffer
+            logger.debug("⏳ Waiting %.1f seconds for rate limit...", wait_time)
+            await asyncio.sleep(wait_time + 1)  # Add 1 second buffer
+        
+        self._record_request()
     
-    def is_available(self) -> bool:
-        """Check if OpenAI service is available"""
-        return self.client is not None and self.api_key is not None
+    @classmethod
+    def _get_loop(cls) -> asyncio.AbstractEventLoop:
+        """Get the service event loop, starting it on first use"""
+        if cls._loop is None:
+            with cls._loop_lock:
+                if cls._loop is None:
+                    loop = asyncio.new_event_loop()
+                    threading.Thread(target=loop.run_forever, name='openai-loop', daemon=True).start()
+                    cls._loop = loop
+        return cls._loop
     
-    def generate_bedtime_story(self, location: str = "Morocco") -> str:
-        """Generate a one-sentence bedtime story about a specific location"""
-        if not self.is_available():
-            return "OpenAI service is not available. Please check your API key configuration."
+    def _run(self, coro):
+        """Run a coroutine on the service loop and block until it finishes"""
+        return asyncio.run_coroutine_threadsafe(coro, self._get_loop()).result()
+    
+    def _bind_unavailable(self):
+        """Point the generation methods at stubs that report the missing client"""
+        async def astream_unavailable(*args, **kwargs):
+            yield _UNAVAILABLE_MESSAGE
         
-        # Respect rate limit
-        self._wait_for_rate_limit()
+        async def agenerate_unavailable(*args, **kwargs):
+            return _UNAVAILABLE_MESSAGE
+        
+        def stream_unavailable(*args, **kwargs):
+            return iter((_UNAVAILABLE_MESSAGE,))
         
+        def generate_unavailable(*args, **kwargs):
+            return _UNAVAILABLE_MESSAGE
+        
+        for kind in ('bedtime_story', 'call_summary', 'custom_response'):
+            setattr(self, f'astream_{kind}', astream_unavailable)
+            setattr(self, f'agenerate_{kind}', agenerate_unavailable)
+            setattr(self, f'stream_{kind}', stream_unavailable)
+            setattr(self, f'generate_{kind}', generate_unavailable)
+    
+    def is_available(self) -> bool:
+        """Check if OpenAI service is available"""
+        return self._available
+    
+    def _iterate(self, agen):
+        """Drive an async generator on the service loop from synchronous code"""
         try:
-            prompt = f"Write a one-sentence bedtime story about {location}."
-            
-            print(f"🤖 Generating bedtime story about {location}... (respecting rate limit)")
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a creative storyteller who writes beautiful, gentle bedtime stories. Create only one sentence that is magical and soothing."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                max_tokens=100,
-                temperature=0.8
-            )
-            
-            # Record the request
-            self._record_request()
-            
-            story = response.choices[0].message.content.strip()
-            print(f"✅ Generated story: {story}")
-            return story
+            while True:
+                try:
+                    yield self._run(agen.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            # Also runs when the consumer stops early, releasing the HTTP stream
+            self._run(agen.aclose())
+    
+    async def _astream_completion(self, messages, create_kwargs: Dict[str, Any], error_label: str):
+        """Yield the text deltas of a streamed chat completion"""
+        try:
+            stream = await self.client.chat.completions.create(messages=messages, **create_kwargs)
+            async for chunk in stream:
+                if chunk.choices:
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        yield delta
             
         except Exception as e:
-            error_msg = f"Error generating bedtime story: {str(e)}"
-            print(f"❌ {error_msg}")
-            return error_msg
+            error_msg = f"Error generating {error_label}: {str(e)}"
+            logger.error("❌ %s", error_msg)
+            yield error_msg
     
-    def generate_call_summary(self, audio_file_name: str) -> str:
-        """Generate a summary of what might have been discussed in the call"""
-        if not self.is_available():
-            return "OpenAI service is not available. Please check your API key configuration."
+    async def astream_bedtime_story(self, location: str = "Morocco"):
+        """Stream a one-sentence bedtime story about a specific location"""
+        # Respect rate limit
+        await self._wait_for_rate_limit()
+        
+        logger.debug("🤖 Generating bedtime story about %s... (respecting rate limit)", location)
         
+        messages = _messages_for_bedtime(location)
+        async for delta in self._astream_completion(messages, self._bedtime_kwargs, "bedtime story"):
+            yield delta
+    
+    async def astream_call_summary(self, audio_file_name: str):
+        """Stream a summary of what might have been discussed in the call"""
         # Respect rate limit
-        self._wait_for_rate_limit()
+        await self._wait_for_rate_limit()
         
-        try:
-            prompt = f"Generate a brief, creative summary of what might have been discussed in a phone call that was recorded as '{audio_file_name}'. Make it whimsical and imaginative."
-            
-            print(f"🤖 Generating call summary for {audio_file_name}... (respecting rate limit)")
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a creative writer who imagines interesting conversations. Create brief, family-friendly summaries that are whimsical and positive."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                max_tokens=80,
-                temperature=0.7
-            )
-            
-            # Record the request
-            self._record_request()
-            
-            summary = response.choices[0].message.content.strip()
-            print(f"✅ Generated summary: {summary}")
-            return summary
-            
-        except Exception as e:
-            error_msg = f"Error generating call summary: {str(e)}"
-            print(f"❌ {error_msg}")
-            return error_msg
+        logger.debug("🤖 Generating call summary for %s... (respecting rate limit)", audio_file_name)
+        
+        messages = _messages_for_summary(audio_file_name)
+        async for delta in self._astream_completion(messages, self._summary_kwargs, "call summary"):
+            yield delta
+    
+    async def astream_custom_response(self, prompt: str, max_tokens: int = 150):
+        """Stream a custom response based on user prompt"""
+        logger.debug("🤖 Generating response for: %.50s...", prompt)
+        
+        create_kwargs = self._custom_kwargs
+        if max_tokens != create_kwargs['max_tokens']:
+            create_kwargs = dict(create_kwargs, max_tokens=max_tokens)
+        
+        messages = _messages_for_custom(prompt)
+        async for delta in self._astream_completion(messages, create_kwargs, "response"):
+            yield delta
+    
+    async def agenerate_bedtime_story(self, location: str = "Morocco") -> str:
+        """Generate a one-sentence bedtime story about a specific location"""
+        story = ''.join([delta async for delta in self.astream_bedtime_story(location)]).strip()
+        logger.debug("✅ Generated story: %s", story)
+        return story
+    
+    async def agenerate_call_summary(self, audio_file_name: str) -> str:
+        """Generate a summary of what might have been discussed in the call"""
+        summary = ''.join([delta async for delta in self.astream_call_summary(audio_file_name)]).strip()
+        logger.debug("✅ Generated summary: %s", summary)
+        return summary
+    
+    async def agenerate_custom_response(self, prompt: str, max_tokens: int = 150) -> str:
+        """Generate a custom response based on user prompt"""
+        result = ''.join([delta async for delta in self.astream_custom_response(prompt, max_tokens)]).strip()
+        logger.debug("✅ Generated response: %.100s...", result)
+        return result
+    
+    # Blocking wrappers for callers outside the event loop
+    
+    def stream_bedtime_story(self, location: str = "Morocco"):
+        """Stream a bedtime story, yielding text as it is generated"""
+        return self._iterate(self.astream_bedtime_story(location))
+    
+    def stream_call_summary(self, audio_file_name: str):
+        """Stream a call summary, yielding text as it is generated"""
+        return self._iterate(self.astream_call_summary(audio_file_name))
+    
+    def stream_custom_response(self, prompt: str, max_tokens: int = 150):
+        """Stream a custom response, yielding text as it is generated"""
+        return self._iterate(self.astream_custom_response(prompt, max_tokens))
+    
+    def generate_bedtime_story(self, location: str = "Morocco") -> str:
+        """Generate a one-sentence bedtime story about a specific location"""
+        return self._run(self.agenerate_bedtime_story(location))
+    
+    def generate_call_summary(self, audio_file_name: str) -> str:
+        """Generate a summary of what might have been discussed in the call"""
+        return self._run(self.agenerate_call_summary(audio_file_name))
     
     def generate_custom_response(self, prompt: str, max_tokens: int = 150) -> str:
         """Generate a custom response based on user prompt"""
-        if not self.is_available():
-            return "OpenAI service is not available. Please check your API key configuration."
-        
-        try:
-            print(f"🤖 Generating response for: {prompt[:50]}...")
-            
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {
-                        "role": "system", 
-                        "content": "You are a helpful and creative assistant."
-                    },
-                    {
-                        "role": "user", 
-                        "content": prompt
-                    }
-                ],
-                max_tokens=max_tokens,
-                temperature=0.8
-            )
-            
-            result = response.choices[0].message.content.strip()
-            print(f"✅ Generated response: {result[:100]}...")
-            return result
-            
-        except Exception as e:
-            error_msg = f"Error generating response: {str(e)}"
-            print(f"❌ {error_msg}")
-            return error_msg
+        return self._run(self.agenerate_custom_response(prompt, max_tokens))
 
 # Global instance
 openai_service = OpenAIService()
@@ -0,0 +1,87 @@
+"""
+Recording Metadata Store for Sphere AI Clone Backend
+Persists recording metadata in SQLite so it survives restarts and is
+shared between server worker processes
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Optional, Dict, Any, List
+
+from config import config
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rec (
+    id TEXT PRIMARY KEY,
+    model TEXT,
+    start_time TEXT,
+    end_time TEXT,
+    status TEXT,
+    filename TEXT,
+    transcript_filename TEXT,
+    duration REAL,
+    file_size INTEGER
+);
+CREATE INDEX IF NOT EXISTS rec_status_start ON rec (status, start_time);
+"""
+
+# Columns callers are allowed to update
+_COLUMNS = ('model', 'start_time', 'end_time', 'status', 'filename',
+            'transcript_filename', 'duration', 'file_size')
+
+class RecordingStore:
+    """SQLite-backed store for recording metadata"""
+    
+    def __init__(self, db_path: str):
+        """Open (or create) the metadata database"""
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        # One connection shared by all request threads, serialized by a lock
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript(_SCHEMA)
+    
+    def create(self, recording_id: str, model: str, start_time: str, filename: str):
+        """Insert a new in-progress recording"""
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO rec (id, model, start_time, status, filename) VALUES (?, ?, ?, 'recording', ?)",
+                (recording_id, model, start_time, filename)
+            )
+    
+    def update(self, recording_id: str, **fields):
+        """Update columns of an existing recording"""
+        unknown = set(fields) - set(_COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown recording fields: {', '.join(sorted(unknown))}")
+        if not fields:
+            return
+        
+        assignments = ', '.join(f"{name} = ?" for name in fields)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE rec SET {assignments} WHERE id = ?",
+                (*fields.values(), recording_id)
+            )
+    
+    def get(self, recording_id: str) -> Optional[Dict[str, Any]]:
+        """Get a recording's metadata, or None if it does not exist"""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM rec WHERE id = ?", (recording_id,)).fetchone()
+        return dict(row) if row else None
+    
+    def list_completed(self, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get the most recent completed recordings, newest first"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM rec WHERE status = 'completed' ORDER BY start_time DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+# Global store instance
+recording_store = RecordingStore(config.recordings_db_path)
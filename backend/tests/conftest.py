@@ -0,0 +1,43 @@
+"""
+Shared test setup for the Sphere AI Clone backend
+Points recordings and the metadata database at a temporary directory and
+disables OpenAI before any backend module is imported
+"""
+
+import atexit
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+_TEST_DIR = tempfile.mkdtemp(prefix='sphere-tests-')
+atexit.register(shutil.rmtree, _TEST_DIR, ignore_errors=True)
+os.environ['RECORDINGS_DIR'] = os.path.join(_TEST_DIR, 'recordings')
+os.environ['RECORDINGS_DB'] = os.path.join(_TEST_DIR, 'recordings.db')
+os.environ['OPENAI_API_KEY'] = ''
+
+@pytest.fixture
+def client():
+    """Flask test client for the backend app"""
+    import app
+    return app.app.test_client()
+
+@pytest.fixture
+def wait_until_finished():
+    """Poll /recording/status until a recording is no longer processing"""
+    def wait(client, recording_id, timeout=10):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            response = client.get(f'/recording/status/{recording_id}')
+            if response.json['status'] != 'processing':
+                return response
+            time.sleep(0.02)
+        raise AssertionError(f"Recording {recording_id} did not finish processing")
+    
+    return wait
@@ -0,0 +1,18 @@
+"""
+Tests for the per-chunk audio features
+"""
+
+import os
+
+from scripts.audio_processor import chunk_rms
+
+def test_chunk_rms_matches_direct_formula():
+    audio_bytes = os.urandom(4096)
+    expected = (sum((b - 128) ** 2 for b in audio_bytes) / len(audio_bytes)) ** 0.5
+    
+    assert abs(chunk_rms(audio_bytes) - expected) < 1e-3
+    assert abs(chunk_rms(memoryview(audio_bytes)) - expected) < 1e-3
+
+def test_chunk_rms_of_silence_and_empty_chunks():
+    assert chunk_rms(b'\x80' * 100) == 0.0
+    assert chunk_rms(b'') == 0.0
@@ -0,0 +1,65 @@
+"""
+Tests for base64 chunk uploads
+"""
+
+import base64
+
+import pytest
+
+@pytest.mark.parametrize('audio_data', ['!!!', 'GkXf\no=', 'GkXfo', 'GkXféo='])
+def test_invalid_base64_chunk_is_rejected(client, audio_data):
+    import app
+    
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    
+    response = client.post('/recording/chunk', json={'recording_id': recording_id, 'audio_data': audio_data})
+    assert response.status_code == 400
+    response = client.post('/recording/chunk/batch', json={'recording_id': recording_id, 'chunks': [audio_data]})
+    assert response.status_code == 400
+    
+    recording_info = app.get_recording(recording_id)
+    assert recording_info["chunks_count"] == 0
+    assert recording_info["data_size"] == 0
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
+
+def test_base64_chunk_is_recorded(client):
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    audio_data = base64.b64encode(b'\x1a' * 300).decode()
+    
+    response = client.post('/recording/chunk', json={'recording_id': recording_id, 'audio_data': audio_data})
+    assert response.status_code == 200
+    assert response.json['chunk_size'] == 300
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
+
+def test_batch_chunks_are_recorded_in_order(client):
+    import app
+    
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    parts = [b'\x1a\x45', b'\xdf\xa3' * 50, b'\x00' * 200]
+    chunks = [
+        base64.b64encode(parts[0]).decode(),
+        {'audio_data': base64.b64encode(parts[1]).decode(), 'detected_speech': 'hello there'},
+        {'audio_data': base64.b64encode(parts[2]).decode()},
+    ]
+    
+    response = client.post('/recording/chunk/batch', json={'recording_id': recording_id, 'chunks': chunks})
+    assert response.status_code == 200
+    assert response.json['chunks_count'] == 3
+    assert response.json['chunks_received'] == 3
+    assert response.json['chunk_size'] == sum(map(len, parts))
+    assert response.json['transcription_queued'] is True
+    
+    recording_info = app.get_recording(recording_id)
+    app.chunk_writer.flush()
+    with open(recording_info["file"].name, 'rb') as f:
+        assert f.read() == b''.join(parts)
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
+
+def test_batch_without_transcription_is_not_queued(client):
+    recording_id = client.post('/recording/start', json={'model': 'test', 'enable_transcription': False}).json['recording_id']
+    chunks = [base64.b64encode(b'\x1a' * 100).decode()] * 2
+    
+    response = client.post('/recording/chunk/batch', json={'recording_id': recording_id, 'chunks': chunks})
+    assert response.status_code == 200
+    assert response.json['transcription_queued'] is False
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
@@ -0,0 +1,58 @@
+"""
+Tests for raw binary chunk uploads
+"""
+
+import io
+
+from werkzeug.exceptions import ClientDisconnected
+
+class TruncatedBody(io.RawIOBase):
+    """Request body that delivers one block, then the client goes away"""
+    
+    def __init__(self, recording_info):
+        self.recording_info = recording_info
+        self.reads = 0
+        self.lock_was_free = []
+    
+    def readable(self):
+        return True
+    
+    def readinto(self, buffer):
+        # The per-recording lock must not be held while the network is read
+        lock = self.recording_info["lock"]
+        acquired = lock.acquire(blocking=False)
+        self.lock_was_free.append(acquired)
+        if acquired:
+            lock.release()
+        
+        self.reads += 1
+        if self.reads > 1:
+            raise ClientDisconnected()
+        buffer[:4] = b'\x1a\x45\xdf\xa3'
+        return 4
+
+def test_truncated_raw_upload_writes_nothing(client):
+    import app
+    
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    recording_info = app.get_recording(recording_id)
+    
+    body = TruncatedBody(recording_info)
+    response = client.post(
+        f'/recording/chunk/{recording_id}',
+        content_type='application/octet-stream',
+        environ_overrides={'wsgi.input': body, 'CONTENT_LENGTH': '1000'}
+    )
+    assert response.status_code >= 400
+    assert body.lock_was_free and all(body.lock_was_free)
+    assert recording_info["chunks_count"] == 0
+    assert recording_info["data_size"] == 0
+    
+    app.chunk_writer.flush()
+    assert recording_info["file"].tell() == 0
+    
+    response = client.post(f'/recording/chunk/{recording_id}', data=b'\x1a' * 100,
+                           content_type='application/octet-stream')
+    assert response.status_code == 200
+    assert response.json['chunks_count'] == 1
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
@@ -0,0 +1,84 @@
+"""
+Tests for .env parsing and settings
+"""
+
+import pytest
+
+import config
+
+ENV_TEXT = """
+# comment
+export QUOTED="x y"
+SINGLE = 'z' # trailing
+PLAIN=plain # inline comment
+HASHED=a#b
+EMPTY=
+FLASK_PORT=5000 # dev
+"""
+
+EXPECTED = {
+    'QUOTED': 'x y',
+    'SINGLE': 'z',
+    'PLAIN': 'plain',
+    'HASHED': 'a#b',
+    'EMPTY': '',
+    'FLASK_PORT': '5000',
+}
+
+@pytest.fixture
+def env_file(tmp_path):
+    def write(text):
+        path = tmp_path / '.env'
+        path.write_text(text, encoding='utf-8')
+        return str(path)
+    
+    return write
+
+def test_parse_env_handles_simple_files_without_dotenv(env_file, monkeypatch):
+    dotenv_values = config.dotenv_values
+    monkeypatch.setattr(config, 'dotenv_values', None)
+    path = env_file(ENV_TEXT)
+    values = config._parse_env(path)
+    assert values == EXPECTED
+    if dotenv_values is not None:
+        assert values == dict(dotenv_values(path))
+    assert config.build_settings(values).flask_port == 5000
+
+def test_parse_env_hands_unsupported_syntax_to_dotenv(env_file):
+    dotenv = pytest.importorskip('dotenv')
+    path = env_file('BASE=root\nEXPANDED=${BASE}/dir\nESCAPED="a\\nb"\n')
+    values = config._parse_env(path)
+    assert values == dict(dotenv.dotenv_values(path))
+    assert values['EXPANDED'] == 'root/dir'
+    assert values['ESCAPED'] == 'a\nb'
+
+def test_parse_env_keeps_unsupported_syntax_literal_without_dotenv(env_file, monkeypatch):
+    monkeypatch.setattr(config, 'dotenv_values', None)
+    path = env_file('EXPANDED=${BASE}/dir\n')
+    assert config._parse_env(path) == {'EXPANDED': '${BASE}/dir'}
+
+def test_log_level_is_normalized_with_info_fallback():
+    assert config.build_settings({'LOG_LEVEL': 'debug'}).log_level == 'DEBUG'
+    assert config.build_settings({'LOG_LEVEL': 'verbose'}).log_level == 'INFO'
+
+def test_load_messages_follow_log_level_from_env(env_file, monkeypatch):
+    import logging
+    
+    path = env_file('SPHERE_TEST_KEY=from-file\n')
+    monkeypatch.setenv('SPHERE_TEST_KEY', 'already-set')
+    monkeypatch.setenv('LOG_LEVEL', 'DEBUG')
+    monkeypatch.setattr(config, '_ENV_FILES', (('.env', path, False),))
+    monkeypatch.setattr(config, '_DOTENV_LOADED', False)
+    
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    config_log = logging.getLogger('config')
+    config_log.addHandler(handler)
+    try:
+        config.EnvironmentConfig()
+    finally:
+        config_log.removeHandler(handler)
+        config.configure_logging(config.get_config().settings.log_level)
+    
+    assert f"✅ Loaded .env from {path}" in [record.getMessage() for record in records]
@@ -0,0 +1,38 @@
+"""
+Tests for finalizing a stopped recording in the background
+"""
+
+import base64
+
+class StubOpenAIService:
+    """Stands in for openai_service with the same method signatures"""
+    
+    def __init__(self):
+        self.summary_requests = []
+    
+    def generate_bedtime_story(self, location: str = "Morocco") -> str:
+        return f"A story about {location}"
+    
+    def generate_call_summary(self, audio_file_name: str) -> str:
+        self.summary_requests.append(audio_file_name)
+        return f"A summary of {audio_file_name}"
+
+def test_finalize_collects_story_and_summary(client, wait_until_finished, monkeypatch):
+    import app
+    
+    stub = StubOpenAIService()
+    monkeypatch.setattr(app, 'openai_service', stub)
+    
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    chunk = base64.b64encode(b'\x1a' * 500).decode()
+    client.post('/recording/chunk', json={'recording_id': recording_id, 'audio_data': chunk})
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
+    
+    result = wait_until_finished(client, recording_id).json
+    assert result['status'] == 'completed'
+    assert stub.summary_requests == [result['filename']]
+    assert result['openai_response'] == {
+        "bedtime_story": "A story about Morocco",
+        "call_summary": f"A summary of {result['filename']}",
+        "story_output_text": "A story about Morocco"
+    }
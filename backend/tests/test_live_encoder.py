@@ -0,0 +1,58 @@
+"""
+Tests for feeding live MP3 encoders alongside the recording files
+"""
+
+import os
+import subprocess
+import sys
+import threading
+
+# Stands in for an ffmpeg that has stalled: it never reads its stdin
+STALLED_ENCODER = [sys.executable, '-c', 'import time; time.sleep(60)']
+
+def test_stalled_encoder_does_not_block_other_recordings(client, monkeypatch):
+    import app
+    
+    stalled = app.EncoderFeeder(subprocess.Popen(STALLED_ENCODER, stdin=subprocess.PIPE, bufsize=0))
+    encoders = [stalled]
+    monkeypatch.setattr(app, 'start_mp3_encoder', lambda path: encoders.pop() if encoders else None)
+    
+    try:
+        stalled_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+        other_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+        
+        # Far more than a pipe buffer holds, so the stalled encoder's feeder blocks
+        response = client.post(f'/recording/chunk/{stalled_id}', data=b'\x1a' * (1024 * 1024),
+                               content_type='application/octet-stream')
+        assert response.status_code == 200
+        
+        response = client.post(f'/recording/chunk/{other_id}', data=b'\x1a' * 1000,
+                               content_type='application/octet-stream')
+        assert response.status_code == 200
+        
+        other_info = app.get_recording(other_id)
+        webm_filepath = os.path.join(app.RECORDINGS_DIR, other_info["webm_filename"])
+        flushed = threading.Event()
+        threading.Thread(target=lambda: (app.chunk_writer.flush(), flushed.set()), daemon=True).start()
+        assert flushed.wait(5), "chunk writer is blocked behind the stalled encoder"
+        assert os.path.getsize(webm_filepath) == 1000
+        
+        assert client.post('/recording/stop', json={'recording_id': other_id}).status_code == 202
+    finally:
+        stalled.process.kill()
+    
+    assert client.post('/recording/stop', json={'recording_id': stalled_id}).status_code == 202
+
+def test_encoder_is_dropped_when_it_falls_too_far_behind():
+    import app
+    
+    feeder = app.EncoderFeeder(subprocess.Popen(STALLED_ENCODER, stdin=subprocess.PIPE, bufsize=0),
+                               max_backlog=256 * 1024)
+    try:
+        for _ in range(8):
+            feeder.submit(b'\x1a' * 64 * 1024)
+        assert feeder.failed
+        feeder.close()
+        assert not app.finish_mp3_encoder(feeder, timeout=5)
+    finally:
+        feeder.process.kill()
@@ -0,0 +1,32 @@
+"""
+Tests for the OpenAI service client setup
+"""
+
+from types import SimpleNamespace
+
+import http_pool
+import openai_service
+from openai_service import OpenAIService
+
+def fake_config(api_key, org_id=None):
+    return SimpleNamespace(openai_api_key=api_key, openai_org_id=org_id, openai_model='test-model')
+
+def test_every_client_shares_one_http_client(monkeypatch):
+    monkeypatch.setattr(OpenAIService, '_client_cache', {})
+    
+    services = []
+    for api_key, org_id in (('sk-one', None), ('sk-two', None), ('sk-one', 'org-test')):
+        monkeypatch.setattr(openai_service, 'get_config', lambda: fake_config(api_key, org_id))
+        services.append(OpenAIService())
+    
+    clients = {id(service.client) for service in services}
+    assert len(clients) == 3
+    shared = http_pool.get_shared_http_client()
+    assert all(service.client._client is shared for service in services)
+
+def test_requests_send_prompt_cache_key_not_user(monkeypatch):
+    monkeypatch.setattr(openai_service, 'get_config', lambda: fake_config('sk-one'))
+    service = OpenAIService()
+    for create_kwargs in (service._bedtime_kwargs, service._summary_kwargs, service._custom_kwargs):
+        assert create_kwargs['prompt_cache_key'] == openai_service._PROMPT_CACHE_KEY
+        assert 'user' not in create_kwargs
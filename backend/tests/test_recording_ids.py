@@ -0,0 +1,30 @@
+"""
+Tests for recording id handling across the recording endpoints
+"""
+
+import base64
+
+def test_non_canonical_id_reaches_the_same_recording(client, wait_until_finished):
+    import app
+    
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    shouted_id = recording_id.upper().replace('-', '')
+    
+    chunk = base64.b64encode(b'\x1a' * 500).decode()
+    response = client.post('/recording/chunk', json={'recording_id': shouted_id, 'audio_data': chunk})
+    assert response.status_code == 200
+    assert response.json['transcription_queued'] is True
+    
+    response = client.post('/recording/stop', json={'recording_id': shouted_id})
+    assert response.status_code == 202
+    assert response.json['recording_id'] == recording_id
+    assert response.json['transcription'] != []
+    assert recording_id not in app.active_transcriptions
+    
+    assert wait_until_finished(client, shouted_id).json['status'] == 'completed'
+    assert app.recording_store.get(recording_id)['status'] == 'completed'
+
+def test_malformed_id_is_rejected(client):
+    assert client.post('/recording/stop', json={'recording_id': 'not-a-uuid'}).status_code == 400
+    assert client.get('/transcription/not-a-uuid').status_code == 400
+    assert client.get('/download/not-a-uuid').status_code == 400
@@ -0,0 +1,73 @@
+"""
+Tests for the WebSocket chunk upload route
+"""
+
+import json
+import threading
+
+import pytest
+
+simple_websocket = pytest.importorskip('simple_websocket')
+
+from werkzeug.serving import make_server
+
+@pytest.fixture
+def server_url(client):
+    """Serve the app on a free local port; WebSockets need a real server"""
+    import app
+    
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    # A socket left open by a failed test must not keep the process alive
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f'ws://127.0.0.1:{server.server_port}'
+    server.shutdown()
+    thread.join()
+
+def receive_until_closed(ws):
+    """Collect messages until the server closes the socket"""
+    messages = []
+    try:
+        while True:
+            message = ws.receive(timeout=5)
+            if message is None:
+                raise AssertionError("socket was not closed")
+            messages.append(message)
+    except simple_websocket.ConnectionClosed:
+        return messages
+
+@pytest.mark.parametrize('frame', ['{not json', '[1, 2]', '"stop"'])
+def test_malformed_control_message_gets_an_error(client, server_url, frame):
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    ws = simple_websocket.Client.connect(f'{server_url}/recording/ws/{recording_id}')
+    ws.send(frame)
+    
+    messages = receive_until_closed(ws)
+    assert [json.loads(m) for m in messages] == [{"success": False, "error": "Invalid control message"}]
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
+
+def test_oversized_binary_message_is_rejected(client, server_url):
+    import app
+    
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    ws = simple_websocket.Client.connect(f'{server_url}/recording/ws/{recording_id}')
+    ws.send(b'\x1a' * (app.config.get_max_chunk_size() + 1))
+    
+    receive_until_closed(ws)
+    assert app.get_recording(recording_id)["chunks_count"] == 0
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
+
+def test_binary_chunks_are_recorded_until_stop(client, server_url):
+    import app
+    
+    recording_id = client.post('/recording/start', json={'model': 'test'}).json['recording_id']
+    ws = simple_websocket.Client.connect(f'{server_url}/recording/ws/{recording_id}')
+    ws.send(b'\x1a' * 100)
+    ws.send(b'\x1a' * 200)
+    ws.send(json.dumps({"action": "stop"}))
+    
+    messages = receive_until_closed(ws)
+    assert [json.loads(m) for m in messages] == [{"action": "stopped", "chunks_count": 2}]
+    assert app.get_recording(recording_id)["data_size"] == 300
+    assert client.post('/recording/stop', json={'recording_id': recording_id}).status_code == 202
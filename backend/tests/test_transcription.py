@@ -0,0 +1,36 @@
+"""
+Tests for live transcription phrases and the transcript kept for finalize
+"""
+
+import dataclasses
+
+def make_transcriber(phrases):
+    import app
+    
+    transcriber = app.SimpleTranscriber('test-recording')
+    transcriber.start_transcription()
+    for phrase in phrases:
+        transcriber._start_phrase(phrase)
+    return transcriber
+
+def test_published_snapshot_is_not_changed_by_later_phrases():
+    import app
+    
+    transcriber = make_transcriber(['one', 'two'])
+    session = transcriber.get_current_transcription()
+    transcriber._start_phrase('three')
+    
+    assert app.full_transcription(session) == ['', 'one', 'two']
+    assert app.full_transcription(transcriber.get_current_transcription()) == ['', 'one', 'two', 'three']
+
+def test_live_view_is_capped_but_final_transcript_is_complete(monkeypatch):
+    import app
+    
+    settings = dataclasses.replace(app.config.settings, max_transcript_phrases=3)
+    monkeypatch.setattr(app.config, 'settings', settings)
+    phrases = [f'phrase {index}' for index in range(10)]
+    transcriber = make_transcriber(phrases)
+    
+    session = transcriber.get_current_transcription()
+    assert app.full_transcription(session) == ['phrase 6', 'phrase 7', 'phrase 8', 'phrase 9']
+    assert transcriber.stop_transcription() == ['', *phrases]
@@ -0,0 +1,45 @@
+"""
+Tests for the length-bucketed transcription batcher
+"""
+
+import threading
+
+def test_buckets_are_transcribed_separately_and_applied_in_order(monkeypatch):
+    import app
+    
+    batches = []
+    applied = []
+    
+    def transcribe_batch(audio_chunks):
+        batches.append([len(chunk) for chunk in audio_chunks])
+        return [f'text {len(chunk)}' for chunk in audio_chunks]
+    
+    def process_chunk_transcription(recording_id, audio_bytes, detected_speech, chunk_count, text):
+        applied.append((chunk_count, text))
+    
+    monkeypatch.setattr(app, 'transcribe_batch', transcribe_batch)
+    monkeypatch.setattr(app, 'process_chunk_transcription', process_chunk_transcription)
+    
+    short, long = app.BUCKET_LIMITS[0] - 1, app.BUCKET_LIMITS[-1] + 1
+    batcher = app.TranscriptionBatcher(max_wait=10)
+    batcher.submit('rec', b'\x1a' * long, None, 1)
+    batcher.submit('rec', b'\x1a' * short, None, 2)
+    # Recognized speech skips the model entirely
+    batcher.submit('rec', b'\x1a' * short, 'hello there', 3)
+    batcher.submit('rec', b'\x1a' * short, 'Speech detected', 4)
+    batcher.flush()
+    
+    assert sorted(batches) == sorted([[short, short], [long]])
+    assert applied == [(1, f'text {long}'), (2, f'text {short}'), (3, None), (4, f'text {short}')]
+
+def test_full_bucket_is_sent_without_waiting(monkeypatch):
+    import app
+    
+    sent = threading.Event()
+    monkeypatch.setattr(app, 'transcribe_batch', lambda chunks: sent.set() or [None] * len(chunks))
+    monkeypatch.setattr(app, 'process_chunk_transcription', lambda *args: None)
+    
+    batcher = app.TranscriptionBatcher(max_wait=60, max_batch=2)
+    batcher.submit('rec', b'\x1a' * 10, None, 1)
+    batcher.submit('rec', b'\x1a' * 10, None, 2)
+    assert sent.wait(5)
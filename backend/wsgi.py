@@ -0,0 +1,14 @@
+"""
+WSGI entry point for Sphere AI Clone Backend
+Run under a production server instead of the Flask development server:
+
+    gunicorn -k gthread -w 1 --threads 16 -b 0.0.0.0:3001 wsgi:application
+
+In-progress recordings (open files, transcribers) live in the worker that
+started them, so keep one worker process and scale with threads. Completed
+recording metadata is shared through the SQLite store.
+"""
+
+from app import app
+
+application = app
@@ -21,10 +21,12 @@ export interface ChatResponse {
 export interface RecordingResponse {
   success: boolean;
   recording_id?: string;
+  status?: 'recording' | 'processing' | 'completed' | 'failed';
   filename?: string;
   duration?: number;
   file_size?: number;
   download_url?: string;
+  status_url?: string;
   message?: string;
   error?: string;
   transcription_enabled?: boolean;
@@ -55,6 +57,7 @@ class BackendService {
   private currentRecordingId: string | null = null;
   private transcriptionInterval: NodeJS.Timeout | null = null;
   private speechRecognition: any = null; // For Web Speech API
+  private audioSocket: WebSocket | null = null; // Raw audio stream, when the backend supports it
   private isListening: boolean = false;
   
   // Continuous recording system
@@ -173,38 +176,89 @@ class BackendService {
       // Combine all accumulated chunks into one blob
       const combinedBlob = new Blob(this.accumulatedAudio, { type: 'audio/webm' });
       
-      // Convert to base64
-      const reader = new FileReader();
-      reader.onloadend = async () => {
-        const base64Data = (reader.result as string).split(',')[1];
+      // Prefer the WebSocket stream; fall back to an HTTP upload
+      if (this.audioSocket && this.audioSocket.readyState === WebSocket.OPEN) {
+        this.audioSocket.send(JSON.stringify({ detected_speech: trigger }));
+        this.audioSocket.send(await combinedBlob.arrayBuffer());
+        console.log('📡 Streamed accumulated audio over WebSocket:', combinedBlob.size, 'bytes');
+        this.accumulatedAudio = [];
+        return;
+      }
+      
+      // Upload the raw bytes directly (no base64/JSON wrapping)
+      try {
+        console.log('📤 Uploading accumulated audio to backend...', combinedBlob.size, 'bytes');
+        const response = await this.makeRequest('/recording/chunk_bin', {
+          method: 'POST',
+          headers: {
+            'Content-Type': 'application/octet-stream',
+            'X-Recording-Id': this.currentRecordingId,
+            'X-Detected-Speech': encodeURIComponent(trigger),
+          },
+          body: combinedBlob,
+        });
+        console.log('✅ Accumulated audio uploaded successfully:', response);
         
-        try {
-          console.log('📤 Uploading accumulated audio to backend...', base64Data.length, 'chars');
-          const response = await this.makeRequest('/recording/chunk', {
-            method: 'POST',
-            body: JSON.stringify({
-              recording_id: this.currentRecordingId,
-              audio_data: base64Data,
-              detected_speech: trigger,
-              chunk_count: this.accumulatedAudio.length
-            }),
-          });
-          console.log('✅ Accumulated audio uploaded successfully:', response);
-          
-          // Clear the accumulated audio after successful upload
-          this.accumulatedAudio = [];
-          
-        } catch (error) {
-          console.error('❌ Failed to upload accumulated audio:', error);
-        }
-      };
-      reader.readAsDataURL(combinedBlob);
+        // Clear the accumulated audio after successful upload
+        this.accumulatedAudio = [];
+        
+      } catch (error) {
+        console.error('❌ Failed to upload accumulated audio:', error);
+      }
       
     } catch (error) {
       console.error('❌ Error sending accumulated audio:', error);
     }
   }
 
+  // Open a WebSocket for streaming raw audio frames to the backend
+  private openAudioSocket(recordingId: string) {
+    try {
+      const protocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:';
+      const socket = new WebSocket(`${protocol}//${window.location.host}${API_BASE_URL}/recording/ws/${recordingId}`);
+      socket.binaryType = 'arraybuffer';
+      socket.onopen = () => console.log('📡 Audio WebSocket connected');
+      socket.onerror = () => console.warn('⚠️ Audio WebSocket unavailable, using HTTP uploads');
+      socket.onclose = () => {
+        if (this.audioSocket === socket) {
+          this.audioSocket = null;
+        }
+      };
+      this.audioSocket = socket;
+    } catch (error) {
+      console.warn('⚠️ Could not open audio WebSocket, using HTTP uploads:', error);
+      this.audioSocket = null;
+    }
+  }
+
+  // Tell the backend the stream is done and wait for it to drain, so the
+  // stop request cannot overtake frames still in flight
+  private closeAudioSocket(): Promise<void> {
+    const socket = this.audioSocket;
+    this.audioSocket = null;
+    if (!socket || socket.readyState !== WebSocket.OPEN) {
+      socket?.close();
+      return Promise.resolve();
+    }
+
+    return new Promise((resolve) => {
+      const timeout = setTimeout(() => {
+        socket.close();
+        resolve();
+      }, 2000);
+      socket.onmessage = () => {
+        clearTimeout(timeout);
+        socket.close();
+        resolve();
+      };
+      socket.onclose = () => {
+        clearTimeout(timeout);
+        resolve();
+      };
+      socket.send(JSON.stringify({ action: 'stop' }));
+    });
+  }
+
   // Continuous audio processing loop (like the Python version)
   private startContinuousProcessing() {
     console.log('🔄 Starting continuous audio processing...');
@@ -345,6 +399,9 @@ class BackendService {
         this.accumulatedAudio = [];
         this.lastProcessTime = Date.now();
 
+        // Stream audio over a WebSocket when the backend offers one
+        this.openAudioSocket(startResponse.recording_id);
+
         // Start transcription polling if enabled
         if (enableTranscription && startResponse.transcription_enabled) {
           this.startTranscriptionPolling();
@@ -444,6 +501,9 @@ class BackendService {
         await this.sendAccumulatedAudio('Final chunk');
       }
 
+      // Finish the audio stream before asking the backend to finalize
+      await this.closeAudioSocket();
+
       // Stop transcription polling
       this.stopTranscriptionPolling();
 
@@ -459,13 +519,19 @@ class BackendService {
 
       // Stop recording on backend
       console.log('📤 Sending stop request to backend...');
-      const stopResponse = await this.makeRequest<RecordingResponse>('/recording/stop', {
+      let stopResponse = await this.makeRequest<RecordingResponse>('/recording/stop', {
         method: 'POST',
         body: JSON.stringify({
           recording_id: this.currentRecordingId
         }),
       });
 
+      // The backend converts and summarizes in the background
+      if (stopResponse.status === 'processing') {
+        console.log('⏳ Waiting for backend to finish processing...');
+        stopResponse = await this.waitForRecordingProcessing(this.currentRecordingId);
+      }
+
       console.log('✅ Backend stop response:', stopResponse);
 
       if (stopResponse.transcription && stopResponse.transcription.length > 0) {
@@ -486,6 +552,18 @@ class BackendService {
     }
   }
 
+  // Poll the backend until a stopped recording has finished processing
+  private async waitForRecordingProcessing(recordingId: string): Promise<RecordingResponse> {
+    for (let attempt = 0; attempt < 120; attempt++) {
+      const statusResponse = await this.makeRequest<RecordingResponse>(`/recording/status/${recordingId}`);
+      if (statusResponse.status !== 'processing') {
+        return statusResponse;
+      }
+      await new Promise(resolve => setTimeout(resolve, 1000));
+    }
+    throw new Error('Timed out waiting for the recording to finish processing');
+  }
+
   // Download recording
   async downloadRecording(recordingId: string): Promise<void> {
     try {